@@ -1,421 +1,76 @@
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
-import pandas as pd
-import re
-from datetime import datetime
-import time
-import pytz
-import plotly.express as px
-
-# --- 1. CONFIGURAÇÃO E ESTILO (DESIGN PREMIUM & COMPACTO) ---
+import uuid
+from esquema import limpar_cpf
+from instrumentacao import iniciar_rerun, finalizar_rerun, rotular, span
+from paginas.comum import estilo
+import painel_admin
+import painel_frota
+
+# --- 1. CONFIGURAÇÃO E ESTILO ---
+# Páginas e recursos são importados só quando usados: o login não carrega Plotly nem abre a planilha
 st.set_page_config(page_title="BYD Pro", page_icon="💎", layout="wide", initial_sidebar_state="collapsed")
 
-st.markdown("""
-    <style>
-        /* --- LIMPEZA GERAL --- */
-        #MainMenu, header, footer, .stDeployButton {display: none !important;}
-        [data-testid="stToolbar"], [data-testid="stDecoration"] {display: none !important;}
-        
-        .block-container {
-            padding-top: 1rem !important; 
-            padding-bottom: 5rem !important;
-            padding-left: 0.5rem !important;
-            padding-right: 0.5rem !important;
-        }
-        
-        /* --- BOTÃO PRINCIPAL --- */
-        div.stButton > button[kind="primary"] {
-            background: linear-gradient(45deg, #28a745, #218838) !important;
-            color: white !important;
-            border-radius: 15px !important;
-            height: 4rem !important;
-            font-weight: 700 !important;
-            font-size: 1.2rem !important;
-            width: 100% !important;
-            border: none !important;
-            box-shadow: 0 4px 10px rgba(40, 167, 69, 0.3);
-            transition: all 0.3s ease;
-        }
-        div.stButton > button[kind="primary"]:active { transform: scale(0.98); }
-
-        /* --- ABAS DE NAVEGAÇÃO --- */
-        div[role="radiogroup"] {
-            display: flex; gap: 8px; background: transparent; border: none; justify-content: center; margin-bottom: 15px;
-        }
-        div[role="radiogroup"] label {
-            flex: 1; text-align: center; border-radius: 12px; padding: 12px 5px; font-size: 0.9rem; cursor: pointer;
-            border: 1px solid #e0e0e0; background-color: #ffffff; color: #666; font-weight: 600;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.03);
-        }
-        div[role="radiogroup"] label[data-checked="true"] {
-            background-color: #1e2a38 !important; color: white !important; border: 1px solid #1e2a38 !important;
-            font-weight: 800 !important; box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }
-
-        /* --- CARDS KPI --- */
-        [data-testid="stMetric"] {
-            background-color: #f8f9fa !important; border: 1px solid #eee !important; padding: 10px !important;
-            border-radius: 12px !important; text-align: center;
-        }
-        [data-testid="stMetricLabel"] { font-size: 0.75rem !important; color: #666; font-weight: 600; text-transform: uppercase; }
-        [data-testid="stMetricValue"] { font-size: 1.1rem !important; font-weight: 800; color: #111; }
-        
-        /* --- ESTILO DE LOGIN --- */
-        .login-header { text-align: center; padding: 2rem 0; animation: fadeIn 1s ease-in; }
-        .login-logo { font-size: 4rem; margin-bottom: 0.5rem; }
-        .login-title { font-size: 2rem; font-weight: 800; color: #1e2a38; margin: 0; }
-        .login-subtitle { font-size: 1rem; color: #888; font-weight: 400; margin-top: 5px; }
-        
-        /* --- AJUSTES TABELA (COMPACTA) --- */
-        .stDataFrame { width: 100% !important; }
-        [data-testid="stDataFrame"] td { white-space: nowrap !important; } 
-        
-        @keyframes fadeIn {
-            0% { opacity: 0; transform: translateY(20px); }
-            100% { opacity: 1; transform: translateY(0); }
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-# --- 2. FUNÇÕES ---
-FUSO_BR = pytz.timezone('America/Sao_Paulo')
-HOJE_BR = datetime.now(FUSO_BR).date()
-COLUNAS_OFICIAIS = ['ID_Unico', 'Status', 'Usuario', 'CPF', 'Data', 'Urbano', 'Boraali', 'app163', 'Outros_Receita', 'Energia', 'Manuten', 'Seguro', 'Aplicativo', 'Alimentacao', 'Outros_Custos', 'KM_Inicial', 'KM_Final', 'Detalhes']
-
-def format_br(valor):
-    return f"R$ {valor:,.2f}".replace(",", "v").replace(".", ",").replace("v", ".")
-
-def format_int_br(valor):
-    return f"{int(valor):,}".replace(",", ".")
+# Medição deste rerun (spans/contadores por sessão; painel em ?admin=<token>)
+if '_perf_sessao' not in st.session_state:
+    st.session_state._perf_sessao = uuid.uuid4().hex[:8]
+iniciar_rerun(st.session_state, st.session_state._perf_sessao)
 
-def limpar_cpf(t):
-    if pd.isna(t) or t == "" or t is None: return ""
-    s = str(t).split('.')[0]
-    s = re.sub(r'\D', '', s)
-    return s.zfill(11)
+estilo()
 
-def v(valor):
-    if valor is None: return 0.0
-    return float(valor)
-
-# Carregamento apenas para leitura inicial
-@st.cache_data(ttl=2)
-def carregar_dados():
-    try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        df = conn.read(worksheet=0, ttl=0)
-        if df is None or df.empty: return pd.DataFrame(columns=COLUNAS_OFICIAIS)
-        df['CPF'] = df['CPF'].apply(limpar_cpf)
-        cols_num = ['Urbano', 'Boraali', 'app163', 'Outros_Receita', 'Energia', 'Manuten', 'Seguro', 'Aplicativo', 'Alimentacao', 'Outros_Custos', 'KM_Inicial', 'KM_Final']
-        for c in cols_num: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0.0)
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-        for col in COLUNAS_OFICIAIS:
-            if col not in df.columns: df[col] = pd.NA
-        return df
-    except: return pd.DataFrame(columns=COLUNAS_OFICIAIS)
-
-# NOVA FUNÇÃO DE SALVAMENTO BLINDADO (Lê Fresco -> Anexa -> Grava)
-def adicionar_registro_seguro(novo_dict):
-    try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        # 1. Lê a versão mais atual direto da nuvem (sem cache)
-        df_atual = conn.read(worksheet=0, ttl=0)
-        
-        # Garante estrutura
-        if df_atual is None or df_atual.empty:
-            df_atual = pd.DataFrame(columns=COLUNAS_OFICIAIS)
-        else:
-            # Garante colunas
-            for col in COLUNAS_OFICIAIS:
-                if col not in df_atual.columns: df_atual[col] = pd.NA
-        
-        # 2. Cria DataFrame da nova linha
-        df_novo_registro = pd.DataFrame([novo_dict])
-        
-        # 3. Concatena
-        df_final = pd.concat([df_atual, df_novo_registro], ignore_index=True)
-        
-        # 4. Atualiza
-        conn.update(worksheet=0, data=df_final)
-        
-        # 5. Limpa cache para o app ver a mudança na recarga
-        st.cache_data.clear()
-        return True
-    except Exception as e:
-        st.error(f"Erro ao salvar na nuvem: {e}")
-        return False
-
-# --- 3. TELA DE LOGIN ---
+# --- 2. TELA DE LOGIN ---
 params = st.query_params
 u_url = params.get("user", "")
 c_url = limpar_cpf(params.get("cpf", ""))
 
+# Painel oculto de desempenho
+token = painel_admin.token_admin()
+if token and params.get("admin", "") == token:
+    from recursos import cache_motoristas, fila_escrita
+    rotular("admin")
+    painel_admin.renderizar(cache_motoristas().estatisticas(), fila_escrita().estado())
+    finalizar_rerun(st.session_state)
+    st.stop()
+
+# Relatório oculto da frota (todos os motoristas)
+token = painel_frota.token_frota()
+if token and params.get("frota", "") == token:
+    from recursos import cache_frota
+    rotular("frota")
+    with span("frota.carregar"):
+        relatorio = cache_frota().obter(None)
+    with span("frota.relatorio"):
+        painel_frota.renderizar(relatorio)
+    finalizar_rerun(st.session_state)
+    st.stop()
+
 if 'autenticado' not in st.session_state:
     st.session_state.autenticado = False
 
 if not st.session_state.autenticado:
-    if u_url and len(c_url) == 11:
-        st.session_state.update({'usuario': u_url, 'cpf_usuario': c_url, 'autenticado': True})
-        st.rerun()
-    else:
-        st.markdown("""
-            <div class="login-header">
-                <div class="login-logo">💎</div>
-                <h1 class="login-title">BYD Pro</h1>
-                <p class="login-subtitle">Gestão Financeira de Alta Performance</p>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        with st.container():
-            n_in = st.text_input("Nome do Motorista", placeholder="Como você quer ser chamado?", key="login_nome")
-            c_in = st.text_input("CPF de Acesso", placeholder="Apenas números", max_chars=11, key="login_cpf")
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            if st.button("ACESSAR SISTEMA", type="primary", key="btn_login"):
-                c_l = limpar_cpf(c_in)
-                if n_in and len(c_l) == 11:
-                    st.session_state.update({'usuario': n_in, 'cpf_usuario': c_l, 'autenticado': True})
-                    st.query_params.update({"user": n_in, "cpf": c_l})
-                    st.rerun()
-                else:
-                    st.toast("⚠️ CPF inválido ou Nome vazio.", icon="🚫")
-        st.stop()
+    from paginas import login
+    rotular("login")
+    if login.renderizar(u_url, c_url): st.rerun()
+    finalizar_rerun(st.session_state)
+    st.stop()
 
-# --- 4. APLICAÇÃO ---
-# Carrega dados iniciais
-df_total = carregar_dados()
-df_user = df_total[(df_total['CPF'] == st.session_state.cpf_usuario) & 
-                   (df_total['Status'] != 'Lixeira')].copy()
+# --- 3. APLICAÇÃO ---
+aviso = st.session_state.pop("aviso", None)
+if aviso: st.toast(aviso, icon="☁️")
 
 nav_opcao = st.radio("", ["📝 LANÇAR", "📊 DASHBOARD"], horizontal=True, label_visibility="collapsed", key="nav_main")
+rotular(nav_opcao)
 
-def configurar_grafico(fig):
-    fig.update_layout(
-        xaxis=dict(fixedrange=True),
-        yaxis=dict(fixedrange=True),
-        margin=dict(l=10, r=10, t=30, b=10),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-        font=dict(size=12),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    return fig
-
+# Cada aba carrega só o que desenha (LANÇAR: a última leitura do hodômetro; DASHBOARD: os lançamentos)
 if nav_opcao == "📝 LANÇAR":
-    st.markdown(f"<h3 style='margin-bottom: 5px;'>Olá, {st.session_state.usuario} 👋</h3>", unsafe_allow_html=True)
-    st.caption(f"Data de hoje: {HOJE_BR.strftime('%d/%m/%Y')}")
-    
-    data_lanc = st.date_input("Data do Lançamento:", value=HOJE_BR, format="DD/MM/YYYY", label_visibility="collapsed", key="data_lanc_input")
-    
-    st.markdown("##### 💰 Ganhos do Dia")
-    with st.container(border=True):
-        c1, c2 = st.columns(2)
-        v1 = c1.number_input("Urbano (99/Uber)", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_urbano")
-        v2 = c2.number_input("BoraAli", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_boraali")
-        v3 = c1.number_input("app163", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_app163")
-        v4 = c2.number_input("Outros", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_outros")
-
-    st.markdown("##### 💸 Custos do Dia")
-    with st.container(border=True):
-        d1, d2 = st.columns(2)
-        cust_e = d1.number_input("Combustível/Energia", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_energia")
-        cust_m = d2.number_input("Manutenção", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_manut")
-        cust_s = d1.number_input("Seguro", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_seguro")
-        cust_o = d2.number_input("Documentos/Multas", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_docs")
-        cust_a = d1.number_input("Mensalidades Apps", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_apps")
-        cust_f = d2.number_input("Outros", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_outros_f")
-    
-    st.markdown("##### 🚗 Hodômetro")
-    u_km = 0
-    if not df_user.empty:
-        try:
-            # Busca KM em toda a base histórica
-            df_km_valid = df_user.sort_values(by='Data', ascending=False)
-            df_km_valid = df_km_valid[df_km_valid['KM_Final'] > 0]
-            if not df_km_valid.empty: 
-                u_km = int(df_km_valid.iloc[0]['KM_Final'])
-        except: u_km = 0
-
-    with st.container(border=True):
-        k1, k2 = st.columns(2)
-        k_ini = k1.number_input("KM Inicial", value=u_km, key="km_inicial_input")
-        k_fim = k2.number_input("KM Final", min_value=0, value=None, placeholder="Ex: 125800", key="km_final_input")
-
-    st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("SALVAR REGISTRO", type="primary", key="btn_salvar"):
-        # Lógica de KM Final automático se deixado em branco ou 0
-        km_f_real = float(k_fim) if k_fim and float(k_fim) > 0 else float(k_ini)
-        
-        novo_id = str(int(time.time()))
-        
-        nova = {col: 0 for col in COLUNAS_OFICIAIS}
-        nova.update({
-            'ID_Unico': novo_id, 'Status': 'Ativo', 
-            'Usuario': st.session_state.usuario, 'CPF': st.session_state.cpf_usuario, 
-            'Data': data_lanc.strftime("%Y-%m-%d"), 
-            'Urbano': v(v1), 'Boraali': v(v2), 'app163': v(v3), 'Outros_Receita': v(v4), 
-            'Energia': v(cust_e), 'Manuten': v(cust_m), 'Seguro': v(cust_s), 
-            'Outros_Custos': v(cust_o), 'Aplicativo': v(cust_a), 'Alimentacao': v(cust_f), 
-            'KM_Inicial': float(k_ini), 'KM_Final': km_f_real
-        })
-        
-        # --- SALVAMENTO BLINDADO ---
-        if adicionar_registro_seguro(nova):
-            st.success("✅ Lançamento salvo com sucesso!")
-            
-            # Limpeza
-            campos_limpar = [
-                "rec_urbano", "rec_boraali", "rec_app163", "rec_outros",
-                "desp_energia", "desp_manut", "desp_seguro", "desp_docs", "desp_apps", "desp_outros_f",
-                "km_final_input"
-            ]
-            for campo in campos_limpar:
-                if campo in st.session_state:
-                    del st.session_state[campo]
-            
-            time.sleep(1.5)
-            st.rerun()
-
+    from paginas import lancar
+    lancar.renderizar()
 elif nav_opcao == "📊 DASHBOARD":
-    if df_user.empty: st.info("Nenhum dado lançado ainda.")
-    else:
-        # Garante ordenação (Recente -> Antigo)
-        df_bi = df_user.copy().sort_values('Data', ascending=False)
-        
-        # Filtro Inteligente (Ignora Futuro)
-        df_passado = df_bi[df_bi['Data'].dt.date <= HOJE_BR]
-        if not df_passado.empty:
-            ultima_data_valida = df_passado['Data'].max()
-            ano_padrao = ultima_data_valida.year
-            mes_padrao = ultima_data_valida.month
-        else:
-            ano_padrao = HOJE_BR.year
-            mes_padrao = HOJE_BR.month
-            
-        with st.expander("📅 Filtrar Período", expanded=False):
-            f_dia = st.date_input("Dia Específico", value=None, format="DD/MM/YYYY", key="filtro_dia")
-            fc1, fc2 = st.columns(2)
-            
-            anos_disp = sorted(df_bi['Data'].dt.year.dropna().unique().astype(int).astype(str).tolist(), reverse=True)
-            if str(HOJE_BR.year) not in anos_disp: anos_disp.insert(0, str(HOJE_BR.year))
-            
-            meses_map = {1:"Janeiro", 2:"Fevereiro", 3:"Março", 4:"Abril", 5:"Maio", 6:"Junho", 7:"Julho", 8:"Agosto", 9:"Setembro", 10:"Outubro", 11:"Novembro", 12:"Dezembro"}
-            
-            try: idx_ano = anos_disp.index(str(ano_padrao))
-            except: idx_ano = 0
-            idx_mes = mes_padrao - 1
-            
-            sel_ano = fc1.selectbox("Ano", ["Todos"] + anos_disp, index=idx_ano+1 if "Todos" in ["Todos"]+anos_disp else 0, key="filtro_ano")
-            sel_mes = fc2.selectbox("Mês", ["Todos"] + list(meses_map.values()), index=idx_mes+1, key="filtro_mes")
-        
-        # Aplica Filtros
-        df_f = df_bi.copy()
-        if f_dia: 
-            df_f = df_f[df_f['Data'].dt.date == f_dia]
-        else:
-            if sel_ano != "Todos": df_f = df_f[df_f['Data'].dt.year == int(sel_ano)]
-            if sel_mes != "Todos": 
-                m_num = list(meses_map.keys())[list(meses_map.values()).index(sel_mes)]
-                df_f = df_f[df_f['Data'].dt.month == m_num]
-
-        # Reordena para tabela
-        df_f = df_f.sort_values(by='Data', ascending=False)
-
-        # Cálculos
-        df_f['Receita'] = df_f[['Urbano','Boraali','app163','Outros_Receita']].sum(axis=1)
-        df_f['Custos'] = df_f[['Energia','Manuten','Seguro','Outros_Custos','Aplicativo','Alimentacao']].sum(axis=1)
-        df_f['Lucro'] = df_f['Receita'] - df_f['Custos']
-        df_f['Km rodados'] = (df_f['KM_Final'] - df_f['KM_Inicial']).clip(lower=0)
-        tr, tc, tl, tk = df_f['Receita'].sum(), df_f['Custos'].sum(), df_f['Lucro'].sum(), df_f['Km rodados'].sum()
-        
-        st.markdown("#### 💵 Performance Financeira")
-        m1, m2, m3 = st.columns(3)
-        m1.metric("Faturamento", format_br(tr))
-        m2.metric("Lucro Líquido", format_br(tl))
-        m3.metric("Custos", format_br(tc))
-        
-        m4, m5, m6 = st.columns(3)
-        m4.metric("KM Total", format_int_br(tk))
-        m5.metric("Fat/KM", format_br(tr/tk if tk > 0 else 0)) 
-        m6.metric("Lucro/KM", format_br(tl/tk if tk > 0 else 0))
-
-        st.divider()
-        st.markdown("#### 📋 Extrato Completo")
-        st.caption("↔️ Arraste para o lado para ver mais detalhes")
-        
-        df_ex = df_f.copy()
-        df_ex['Data'] = df_ex['Data'].dt.strftime('%d/%m')
-        
-        cols_ordered = [
-            'Data', 'Receita', 'Custos', 'Lucro', 
-            'Urbano', 'Boraali', 'app163', 'Outros_Receita', 
-            'Energia', 'Manuten', 'Seguro', 'Outros_Custos', 'Aplicativo', 'Alimentacao', 
-            'KM_Inicial', 'KM_Final', 'Usuario', 'ID_Unico'
-        ]
-        cols_final = [c for c in cols_ordered if c in df_ex.columns]
-        
-        st.dataframe(
-            df_ex[cols_final], 
-            use_container_width=True, 
-            height=350,
-            hide_index=True,
-            column_config={
-                "Data": st.column_config.TextColumn("Data", width="small"),
-                "Receita": st.column_config.NumberColumn("Faturamento Total", format="R$ %.2f", width="small"),
-                "Custos": st.column_config.NumberColumn("Custos Totais", format="R$ %.2f", width="small"),
-                "Lucro": st.column_config.NumberColumn("Lucro", format="R$ %.2f", width="small"),
-                "Urbano": st.column_config.NumberColumn("Urbano", format="%.0f", width="small"),
-                "Boraali": st.column_config.NumberColumn("BoraAli", format="%.0f", width="small"),
-                "app163": st.column_config.NumberColumn("163", format="%.0f", width="small"),
-                "Energia": st.column_config.NumberColumn("Energia", format="%.0f", width="small"),
-                "Usuario": st.column_config.TextColumn("Motorista", width="medium"),
-                "KM_Inicial": st.column_config.NumberColumn("KM Ini", format="%d", width="small"),
-                "KM_Final": st.column_config.NumberColumn("KM Fim", format="%d", width="small"),
-            }
-        )
-        
-        with st.expander("🗑️ Excluir um Registro"):
-            ids = df_f['ID_Unico'].tolist()
-            if ids:
-                item_ex = st.selectbox("Selecione o ID", ids, key="delete_select")
-                if st.button("Confirmar Exclusão", key="btn_delete"):
-                    # Use a função segura também para exclusão
-                    conn = st.connection("gsheets", type=GSheetsConnection)
-                    df_del = conn.read(worksheet=0, ttl=0)
-                    df_del.loc[df_del['ID_Unico'] == item_ex, 'Status'] = 'Lixeira'
-                    conn.update(worksheet=0, data=df_del)
-                    st.cache_data.clear()
-                    st.rerun()
-
-        st.divider()
-        st.markdown("#### 📈 Visão Gráfica")
-        df_graph = df_f.sort_values('Data')
-        df_graph['Dia'] = df_graph['Data'].dt.strftime('%d/%m')
-
-        st.caption("Faturamento por App")
-        apps_sum = df_f[['Urbano', 'Boraali', 'app163', 'Outros_Receita']].sum().reset_index()
-        apps_sum.columns = ['App', 'Valor']
-        apps_sum = apps_sum[apps_sum['Valor'] > 0]
-        if not apps_sum.empty:
-            fig_pie = px.pie(apps_sum, values='Valor', names='App', hole=0.4, color_discrete_sequence=px.colors.qualitative.Pastel)
-            st.plotly_chart(configurar_grafico(fig_pie), use_container_width=True, config={'displayModeBar': False})
-
-        st.caption("Comparativo: Faturamento x Lucro")
-        if not df_graph.empty:
-            fig_ev = px.bar(df_graph, x='Dia', y=['Receita', 'Lucro'], barmode='group', text_auto='.2s',
-                           color_discrete_map={'Receita': '#28a745', 'Lucro': '#1e2a38'})
-            st.plotly_chart(configurar_grafico(fig_ev), use_container_width=True, config={'displayModeBar': False})
-
-        st.caption("Eficiência por KM")
-        if not df_graph.empty:
-            df_graph['Fat_KM'] = df_graph.apply(lambda x: x['Receita']/x['Km rodados'] if x['Km rodados'] > 0 else 0, axis=1)
-            df_graph['Lucro_KM'] = df_graph.apply(lambda x: x['Lucro']/x['Km rodados'] if x['Km rodados'] > 0 else 0, axis=1)
-            fig_ef = px.bar(df_graph, x='Dia', y=['Fat_KM', 'Lucro_KM'], barmode='group',
-                            color_discrete_map={'Fat_KM': '#17a2b8', 'Lucro_KM': '#6c757d'})
-            st.plotly_chart(configurar_grafico(fig_ef), use_container_width=True, config={'displayModeBar': False})
+    from paginas import dashboard
+    dashboard.renderizar()
 
 st.markdown("<br><div style='text-align:center; color:#ccc;'>BYD Pro Mobile v19</div><br>", unsafe_allow_html=True)
-if st.button("Sair"): 
+if st.button("Sair"):
     st.session_state.autenticado = False
     st.query_params.clear(); st.rerun()
+
+finalizar_rerun(st.session_state)
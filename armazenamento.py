@@ -0,0 +1,475 @@
+"""Armazenamento dos lançamentos: conexão, backends e gravação append-only.
+
+O app fala só com a interface ``Armazenamento`` (carregar por CPF, anexar,
+mandar para a lixeira, sincronizar a partir de uma marca d'água). ``BYD_ARMAZENAMENTO`` escolhe o backend:
+
+    planilha          Google Sheets (padrão)
+    sqlite            banco local indexado por (CPF, Data)
+    sqlite+planilha   lê do SQLite e espelha cada escrita na planilha
+
+Sincronizar traz só as linhas posteriores à marca e reconcilia o Status
+das já conhecidas (ex.: 'Lixeira'). No SQLite a marca é a última linha
+inserida (rowid), na ordem de gravação e não na de criação do ID; na planilha, que não
+filtra por valor, é a quantidade de linhas da aba já lidas, contada pela
+coluna ID_Unico (o frame do ``read`` perde as linhas em branco). O Status da
+planilha é conferido numa leitura só da coluna, compartilhada por todos os
+CPFs e repetida no máximo a cada ``intervalo_status`` segundos.
+
+Na planilha, salvar um lançamento não relê nem regrava a aba inteira: anexa
+só a linha nova e confere em que linha ela caiu, contra a quantidade de
+linhas que o processo já conhece (a mesma lista de IDs por posição da
+sincronização, que cada append estende). Se outro processo gravou linhas que
+este ainda não tinha visto, a linha nova vai para baixo delas (nada é
+sobrescrito) e a gravação volta marcada como concorrente. Excluir acha a
+linha de cada ID na mesma lista e só relê a coluna ID_Unico se algum não
+estiver lá.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional
+
+import pandas as pd
+import streamlit as st
+
+from instrumentacao import ConexaoInstrumentada
+from odometro import SEM_LEITURA, Odometro, ultima_leitura
+from esquema import COLUNAS_OFICIAIS, COLS_NUM, limpar_cpf, normalizar, compactar, letra_coluna
+
+_DATA_ISO = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+
+class Gravacao(NamedTuple):
+    linha: Optional[int]
+    concorrente: bool
+
+
+@st.cache_resource
+def _conexao_local(caminho):
+    from conexao_local import ConexaoLocal
+    return ConexaoLocal(caminho)
+
+
+def obter_conexao():
+    # BYD_PLANILHA_LOCAL=arquivo.csv roda o app inteiro sem Google Sheets
+    # Toda conexão sai embrulhada para contar chamadas/bytes no rerun corrente
+    caminho = os.environ.get("BYD_PLANILHA_LOCAL")
+    if caminho: return ConexaoInstrumentada(_conexao_local(caminho))
+    from streamlit_gsheets import GSheetsConnection
+    return ConexaoInstrumentada(st.connection("gsheets", type=GSheetsConnection))
+
+
+_ABAS = weakref.WeakKeyDictionary()
+
+
+def abrir_aba(conn):
+    # Abrir custa duas chamadas (planilha + metadados da aba): o Worksheet vale enquanto a conexão viver
+    aba = _ABAS.get(conn)
+    if aba is None: aba = _ABAS[conn] = conn.client._select_worksheet(worksheet=0)
+    return aba
+
+
+def _linha_da_faixa(faixa):
+    m = re.search(r"![A-Z]+(\d+)", faixa or "")
+    return int(m.group(1)) if m else None
+
+
+def _celula(valor):
+    if valor is None: return ""
+    try:
+        if pd.isna(valor): return ""
+    except (TypeError, ValueError):
+        pass
+    return valor
+
+
+def anexar_registros(conn, registros, estado):
+    """Anexa ``registros`` ao fim da aba, num único append, sem reler os dados existentes.
+
+    A ``Gravacao`` devolvida traz a linha do primeiro registro e se ele caiu
+    abaixo de linhas que ``estado`` (``_EstadoAba``) ainda não conhecia.
+    """
+    aba = abrir_aba(conn)
+    cabecalho = aba.row_values(1)
+    if not cabecalho:
+        aba.append_rows([COLUNAS_OFICIAIS], value_input_option="USER_ENTERED", table_range="A1")
+        cabecalho = list(COLUNAS_OFICIAIS)
+
+    # Cabeçalho + linhas de dados conhecidas (a coluna ID_Unico só é lida se o estado ainda não foi)
+    versao = estado.linhas(aba, cabecalho) + 1
+    linhas = [[_celula(registro.get(col)) for col in cabecalho] for registro in registros]
+    resposta = aba.append_rows(linhas, value_input_option="USER_ENTERED", table_range="A1")
+    gravada = _linha_da_faixa(resposta.get("updates", {}).get("updatedRange"))
+    if gravada is not None:
+        estado.estender(gravada - 2, *(_como_texto(pd.Series([r.get(c) for r in registros], dtype=object)) for c in ('ID_Unico', 'Status')))
+    return Gravacao(gravada, gravada is not None and gravada != versao + 1)
+
+
+def marcar_lixeira_planilha(conn, ids_unicos, estado):
+    """Soft-delete: troca só a célula Status das linhas com esses IDs (linhas nunca mudam de posição).
+
+    As linhas vêm de ``estado``; todas as células vão numa única chamada.
+    Retorna quantas linhas foram marcadas.
+    """
+    alvo = {str(i) for i in ids_unicos}
+    aba = abrir_aba(conn)
+    cabecalho = aba.row_values(1)
+    col_status = letra_coluna(cabecalho.index('Status') + 1)
+    linhas = estado.linhas_dos_ids(aba, cabecalho, alvo)
+    if linhas:
+        aba.batch_update([{"range": f"{col_status}{linha}", "values": [["Lixeira"]]} for linha in linhas],
+                         value_input_option="USER_ENTERED")
+        estado.marcar(alvo, 'Lixeira')
+    return len(linhas)
+
+
+def ids_existentes_planilha(conn, ids_unicos):
+    aba = abrir_aba(conn)
+    cabecalho = aba.row_values(1)
+    if not cabecalho: return set()
+    presentes = {str(v) for v in aba.col_values(cabecalho.index('ID_Unico') + 1)[1:]}
+    return presentes & {str(i) for i in ids_unicos}
+
+
+def mesclar(df, novos, status):
+    """Junta ao frame em cache as linhas novas e aplica o Status atual (Series ID_Unico -> Status)."""
+    if novos is not None and not novos.empty:
+        if df.empty: df = novos.reset_index(drop=True)
+        else: df = pd.concat([df[~df['ID_Unico'].isin(novos['ID_Unico'])], novos], ignore_index=True)
+    if status is not None and not status.empty and not df.empty:
+        status = status[~status.index.duplicated(keep='last')]
+        df = df.assign(Status=df['ID_Unico'].map(status).fillna(df['Status'].astype(object)))
+    return compactar(df)
+
+
+# --- BACKENDS ---
+class Armazenamento(ABC):
+    @abstractmethod
+    def carregar(self, cpf=None):
+        """Lançamentos normalizados (todos, ou só os do CPF), incluindo os da lixeira."""
+
+    @abstractmethod
+    def anexar(self, registro):
+        """Grava um lançamento novo."""
+
+    @abstractmethod
+    def marcar_lixeira(self, id_unico):
+        """Marca o lançamento como 'Lixeira'. Retorna se achou o ID."""
+
+    def anexar_varios(self, registros):
+        """Grava vários lançamentos; backends remotos fazem isso numa única chamada."""
+        for registro in registros: self.anexar(registro)
+
+    def marcar_lixeira_varios(self, ids_unicos):
+        for id_unico in ids_unicos: self.marcar_lixeira(id_unico)
+
+    @abstractmethod
+    def existentes(self, ids_unicos):
+        """Quais desses IDs já estão gravados (para repetir um envio sem duplicar)."""
+
+    def carregar_com_marca(self, cpf):
+        """Carga completa mais a marca d'água para as próximas sincronizações (``cpf=None``: a frota toda)."""
+        return self.carregar(cpf), None
+
+    def sincronizar(self, cpf, df, marca):
+        """Atualiza ``df`` (carregado antes com ``marca``). Padrão: recarrega tudo."""
+        return self.carregar_com_marca(cpf)
+
+    def ultimo_odometro(self, cpf):
+        """Última leitura do hodômetro do motorista (``odometro.Odometro``) sem trazer o resto dos lançamentos."""
+        return ultima_leitura(self.carregar(cpf))
+
+
+def _como_texto(serie):
+    # Como ``normalizar`` deixa o ID_Unico (números lidos como float perdem o '.0')
+    return serie.astype('string').fillna("").str.removesuffix('.0').tolist()
+
+
+class _EstadoAba:
+    """ID_Unico e Status de cada linha da aba (posição = linha - 2), comum a todos os CPFs.
+
+    A aba só cresce e as linhas não mudam de lugar: os IDs vêm da coluna
+    ID_Unico (lida por posição, com as linhas em branco) e das linhas novas que
+    cada sincronização já traz; do resto só o Status pode mudar, e ele é relido
+    (uma coluna) no máximo a cada ``intervalo`` segundos, não por CPF.
+    """
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.ids = None
+        self.status = []
+        # ID -> posições (IDs antigos, em segundos, podem se repetir)
+        self.posicoes = {}
+        self.lido_em = float("-inf")
+        self._trava = threading.Lock()
+
+    def _ler_ids(self, aba, cabecalho):
+        valores = aba.col_values(cabecalho.index('ID_Unico') + 1, value_render_option="UNFORMATTED_VALUE")[1:]
+        self.ids = _como_texto(pd.Series(valores, dtype=object))
+        self.posicoes = {}
+        for posicao, id_unico in enumerate(self.ids):
+            if id_unico: self.posicoes.setdefault(id_unico, []).append(posicao)
+        # Status relido na próxima consulta, já nas posições novas
+        self.status, self.lido_em = [""] * len(self.ids), float("-inf")
+
+    def linhas(self, aba, cabecalho):
+        """Quantas linhas de dados este processo já sabe que a aba tem."""
+        with self._trava:
+            if self.ids is None: self._ler_ids(aba, cabecalho)
+            return len(self.ids)
+
+    def linhas_dos_ids(self, aba, cabecalho, ids_unicos):
+        """Linhas da aba com esses IDs; relê a coluna ID_Unico se algum ainda não é conhecido (gravado por outro processo)."""
+        with self._trava:
+            if self.ids is None or any(i not in self.posicoes for i in ids_unicos): self._ler_ids(aba, cabecalho)
+            return sorted(p + 2 for i in ids_unicos for p in self.posicoes.get(i, []))
+
+    def reler_ids(self, aba, cabecalho):
+        """Relê a coluna ID_Unico e devolve quantas linhas de dados a aba tem (a marca d'água da planilha)."""
+        with self._trava:
+            self._ler_ids(aba, cabecalho)
+            return len(self.ids)
+
+    def estender(self, inicio, ids, status):
+        """Linhas lidas a partir da posição ``inicio`` (linhas em branco vêm com ID vazio)."""
+        with self._trava:
+            if self.ids is None: return
+            falta = inicio + len(ids) - len(self.ids)
+            if falta > 0:
+                self.ids += [""] * falta
+                self.status += [""] * falta
+            for posicao, id_unico in enumerate(ids, start=inicio):
+                anterior = self.ids[posicao]
+                if anterior == id_unico: continue
+                if anterior: self.posicoes[anterior].remove(posicao)
+                if id_unico: self.posicoes.setdefault(id_unico, []).append(posicao)
+                self.ids[posicao] = id_unico
+            self.status[inicio:inicio + len(ids)] = status
+
+    def marcar(self, ids_unicos, valor):
+        # Gravado por este processo: vale já, sem esperar a próxima releitura
+        with self._trava:
+            if self.ids is None: return
+            for id_unico in ids_unicos:
+                for posicao in self.posicoes.get(id_unico, []): self.status[posicao] = valor
+
+    def status_atual(self, aba, cabecalho):
+        """Series ID_Unico -> Status (sem os vazios); relê a coluna se passou do intervalo."""
+        with self._trava:
+            if self.ids is None: self._ler_ids(aba, cabecalho)
+            if time.monotonic() - self.lido_em >= self.intervalo:
+                coluna = aba.col_values(cabecalho.index('Status') + 1)[1:len(self.ids) + 1]
+                self.status = coluna + [""] * (len(self.ids) - len(coluna))
+                self.lido_em = time.monotonic()
+            status = pd.Series(self.status, index=self.ids, dtype=object)
+        return status[status != ""]
+
+
+class ArmazenamentoPlanilha(Armazenamento):
+    def __init__(self, conn, intervalo_status=10.0):
+        self.conn = conn
+        self._aba = _EstadoAba(intervalo_status)
+
+    def carregar(self, cpf=None):
+        return normalizar(self.conn.read(worksheet=0, ttl=0), cpf)
+
+    def anexar(self, registro):
+        return anexar_registros(self.conn, [registro], self._aba)
+
+    def anexar_varios(self, registros):
+        if registros: return anexar_registros(self.conn, registros, self._aba)
+
+    def marcar_lixeira(self, id_unico):
+        return self.marcar_lixeira_varios([id_unico]) > 0
+
+    def marcar_lixeira_varios(self, ids_unicos):
+        return marcar_lixeira_planilha(self.conn, ids_unicos, self._aba)
+
+    def existentes(self, ids_unicos):
+        return ids_existentes_planilha(self.conn, ids_unicos)
+
+    def carregar_com_marca(self, cpf):
+        # Marca pela coluna ID_Unico, lida antes do frame: o que for gravado entre as duas leituras volta na sincronização
+        aba = abrir_aba(self.conn)
+        cabecalho = aba.row_values(1)
+        marca = self._aba.reler_ids(aba, cabecalho) if 'ID_Unico' in cabecalho else 0
+        return normalizar(self.conn.read(worksheet=0, ttl=0), cpf), marca
+
+    def ultimo_odometro(self, cpf):
+        # Só as quatro colunas que a leitura usa, em vez da aba inteira
+        aba = abrir_aba(self.conn)
+        cabecalho = aba.row_values(1)
+        if not cabecalho: return SEM_LEITURA
+        colunas = {c: aba.col_values(cabecalho.index(c) + 1, value_render_option=render)[1:]
+                   for c, render in [('CPF', "UNFORMATTED_VALUE"), ('Status', "FORMATTED_VALUE"),
+                                     ('Data', "FORMATTED_VALUE"), ('KM_Final', "UNFORMATTED_VALUE")]}
+        # O gspread corta as células vazias do fim de cada coluna
+        linhas = max(len(v) for v in colunas.values())
+        df = pd.DataFrame({c: v + [""] * (linhas - len(v)) for c, v in colunas.items()})
+        return ultima_leitura(normalizar(df, cpf))
+
+    def sincronizar(self, cpf, df, marca):
+        aba = abrir_aba(self.conn)
+        cabecalho = aba.row_values(1)
+        largura = len(cabecalho)
+        # Só as linhas depois da marca (a aba só cresce: gravação é append-only)
+        linhas = aba.get(f"A{marca + 2}:{letra_coluna(largura)}",
+                         value_render_option="UNFORMATTED_VALUE", date_time_render_option="FORMATTED_STRING")
+        novos = None
+        if linhas:
+            bruto = pd.DataFrame([list(l) + [""] * (largura - len(l)) for l in linhas], columns=cabecalho)
+            self._aba.estender(marca, _como_texto(bruto['ID_Unico']), _como_texto(bruto['Status']))
+            # Linhas em branco contam na posição, mas não são lançamentos
+            novos = normalizar(bruto[(bruto != "").any(axis=1)], cpf)
+        # Status das linhas já conhecidas: do estado da aba, comum a todos os CPFs
+        return mesclar(df, novos, self._aba.status_atual(aba, cabecalho)), marca + len(linhas)
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    _TIPOS = {c: 'REAL' for c in COLS_NUM}
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        colunas = ", ".join(f'"{c}" {self._TIPOS.get(c, "TEXT")}' for c in COLUNAS_OFICIAIS)
+        with self._abrir() as db:
+            db.execute(f"CREATE TABLE IF NOT EXISTS registros ({colunas})")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_cpf_data ON registros (CPF, Data)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_id ON registros (ID_Unico)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_cpf_id ON registros (CPF, ID_Unico, Status)")
+            # (CPF, rowid): linhas do motorista inseridas depois da marca, por busca no índice
+            db.execute("CREATE INDEX IF NOT EXISTS idx_cpf ON registros (CPF)")
+
+    def _abrir(self):
+        # Uma conexão por operação: o Streamlit roda cada sessão em uma thread
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def vazio(self):
+        with self._abrir() as db:
+            return db.execute("SELECT 1 FROM registros LIMIT 1").fetchone() is None
+
+    def carregar(self, cpf=None):
+        sql, args = "SELECT * FROM registros", ()
+        if cpf is not None: sql, args = sql + " WHERE CPF = ?", (cpf,)
+        with self._abrir() as db:
+            df = pd.read_sql_query(sql + " ORDER BY Data", db, params=args)
+        return normalizar(df)
+
+    def _ultima_linha(self, db):
+        return db.execute("SELECT COALESCE(MAX(rowid), 0) FROM registros").fetchone()[0]
+
+    def carregar_com_marca(self, cpf):
+        # Marca lida antes da carga: o que for inserido entre as duas volta na sincronização
+        with self._abrir() as db: marca = self._ultima_linha(db)
+        return self.carregar(cpf), marca
+
+    def sincronizar(self, cpf, df, marca):
+        # Por ordem de inserção: um lançamento que a fila segurou chega com ID mais antigo que os já vistos
+        do_cpf, args = ("CPF = ?", (cpf,)) if cpf is not None else ("1", ())
+        with self._abrir() as db:
+            ate = self._ultima_linha(db)
+            novos = pd.read_sql_query(f"SELECT * FROM registros WHERE {do_cpf} AND rowid > ? AND rowid <= ? ORDER BY rowid",
+                                      db, params=args + (marca, ate))
+            status = pd.read_sql_query(f"SELECT ID_Unico, Status FROM registros WHERE {do_cpf}", db, params=args)
+        novos = normalizar(novos) if not novos.empty else None
+        return mesclar(df, novos, status.set_index('ID_Unico')['Status'].dropna()), max(marca, ate)
+
+    def ultimo_odometro(self, cpf):
+        with self._abrir() as db:
+            linha = db.execute("SELECT Data, KM_Final FROM registros WHERE CPF = ? AND KM_Final > 0 AND Data IS NOT NULL "
+                               "AND COALESCE(Status, '') != 'Lixeira' ORDER BY Data DESC, KM_Final DESC LIMIT 1", (cpf,)).fetchone()
+        return Odometro(pd.Timestamp(linha[0]), int(linha[1])) if linha else SEM_LEITURA
+
+    def anexar(self, registro):
+        self.anexar_varios([registro])
+        return Gravacao(None, False)
+
+    def anexar_varios(self, registros):
+        linhas = [tuple(self._valor(c, r.get(c)) for c in COLUNAS_OFICIAIS) for r in registros]
+        marcadores = ", ".join("?" * len(COLUNAS_OFICIAIS))
+        with self._abrir() as db:
+            db.executemany(f"INSERT INTO registros VALUES ({marcadores})", linhas)
+
+    def marcar_lixeira(self, id_unico):
+        return self.marcar_lixeira_varios([id_unico]) > 0
+
+    def marcar_lixeira_varios(self, ids_unicos):
+        with self._abrir() as db:
+            cur = db.executemany("UPDATE registros SET Status = 'Lixeira' WHERE ID_Unico = ?", [(str(i),) for i in ids_unicos])
+            return cur.rowcount
+
+    def existentes(self, ids_unicos):
+        ids = [str(i) for i in ids_unicos]
+        if not ids: return set()
+        with self._abrir() as db:
+            linhas = db.execute(f"SELECT ID_Unico FROM registros WHERE ID_Unico IN ({', '.join('?' * len(ids))})", ids).fetchall()
+        return {l[0] for l in linhas}
+
+    def _valor(self, col, valor):
+        valor = _celula(valor)
+        if valor == "": return None
+        if col in self._TIPOS: return float(valor)
+        if col == 'CPF': return limpar_cpf(valor)
+        # Já no formato gravado (o caso de toda linha do app e da importação): sem parse por linha
+        if col == 'Data': return valor if isinstance(valor, str) and _DATA_ISO.match(valor) else pd.to_datetime(valor).strftime("%Y-%m-%d")
+        return str(valor)
+
+
+class ArmazenamentoEspelhado(Armazenamento):
+    """Lê do backend local; cada escrita vai primeiro para ele e depois para o espelho."""
+
+    def __init__(self, local, espelho):
+        self.local, self.espelho = local, espelho
+        if local.vazio():
+            df = espelho.carregar()
+            if not df.empty: local.anexar_varios(df.to_dict('records'))
+
+    def carregar(self, cpf=None):
+        return self.local.carregar(cpf)
+
+    def carregar_com_marca(self, cpf):
+        return self.local.carregar_com_marca(cpf)
+
+    def sincronizar(self, cpf, df, marca):
+        return self.local.sincronizar(cpf, df, marca)
+
+    def ultimo_odometro(self, cpf):
+        return self.local.ultimo_odometro(cpf)
+
+    def anexar(self, registro):
+        self.local.anexar(registro)
+        return self.espelho.anexar(registro)
+
+    def anexar_varios(self, registros):
+        # Numa repetição o local pode já ter parte do lote (o espelho falhou depois)
+        ja_locais = self.local.existentes([r.get('ID_Unico') for r in registros])
+        self.local.anexar_varios([r for r in registros if str(r.get('ID_Unico')) not in ja_locais])
+        return self.espelho.anexar_varios(registros)
+
+    def marcar_lixeira(self, id_unico):
+        achou = self.local.marcar_lixeira(id_unico)
+        self.espelho.marcar_lixeira(id_unico)
+        return achou
+
+    def marcar_lixeira_varios(self, ids_unicos):
+        n = self.local.marcar_lixeira_varios(ids_unicos)
+        self.espelho.marcar_lixeira_varios(ids_unicos)
+        return n
+
+    def existentes(self, ids_unicos):
+        return self.espelho.existentes(ids_unicos)
+
+
+@st.cache_resource
+def _armazenamento(tipo, caminho_sqlite):
+    if tipo == "sqlite": return ArmazenamentoSQLite(caminho_sqlite)
+    if tipo == "sqlite+planilha":
+        return ArmazenamentoEspelhado(ArmazenamentoSQLite(caminho_sqlite), ArmazenamentoPlanilha(obter_conexao()))
+    return ArmazenamentoPlanilha(obter_conexao())
+
+
+def obter_armazenamento():
+    return _armazenamento(os.environ.get("BYD_ARMAZENAMENTO", "planilha"),
+                          os.environ.get("BYD_SQLITE", "byd_pro.db"))
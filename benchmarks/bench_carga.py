@@ -0,0 +1,225 @@
+"""Benchmark de carga: os caminhos quentes do app.py contra uma planilha sintética.
+
+    python benchmarks/bench_carga.py --motoristas 200 --anos 3 --saida bench.json
+    python benchmarks/bench_carga.py --latencia 0.15 --comparar bench.json
+
+A ``st.connection("gsheets")`` é trocada por ``ConexaoLocal`` (latência
+simulada por chamada) com N motoristas x M anos no esquema oficial. Cada
+caminho é medido com as mesmas funções que o app usa e o resultado vai para
+um JSON (tempos em ms, chamadas remotas e bytes por operação), que pode ser
+comparado com uma execução anterior para achar regressões.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd  # noqa: E402
+
+from armazenamento import ArmazenamentoPlanilha, ArmazenamentoSQLite  # noqa: E402
+from cache_motorista import CacheMotorista  # noqa: E402
+from conexao_local import ConexaoLocal  # noqa: E402
+from dados_sinteticos import gerar_planilha, cpf_sintetico  # noqa: E402
+from esquema import COLUNAS_OFICIAIS, gerar_id, normalizar  # noqa: E402
+from metricas import indexar_por_data, filtrar_periodo, colunas_calculadas, participacao_apps, agrupar_no_tempo  # noqa: E402
+from odometro import ultima_leitura, verificar  # noqa: E402
+from rollups import DadosMotorista, totais_agregado  # noqa: E402
+
+
+def _versao_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def novo_registro(cpf, data):
+    nova = {col: 0 for col in COLUNAS_OFICIAIS}
+    nova.update({'ID_Unico': gerar_id(), 'Status': 'Ativo', 'Usuario': 'Bench', 'CPF': cpf,
+                 'Data': data.strftime("%Y-%m-%d"), 'Urbano': 250.0, 'Energia': 30.0,
+                 'KM_Inicial': 1000.0, 'KM_Final': 1180.0})
+    return nova
+
+
+class Medidor:
+    def __init__(self, conn, repeticoes):
+        self.conn = conn
+        self.repeticoes = repeticoes
+        self.resultados = {}
+
+    def medir(self, nome, funcao, preparar=None):
+        tempos = []
+        if self.conn is not None: self.conn.zerar_contadores()
+        for _ in range(self.repeticoes):
+            arg = preparar() if preparar else None
+            t0 = time.perf_counter()
+            funcao(arg) if preparar else funcao()
+            tempos.append((time.perf_counter() - t0) * 1000)
+        tempos.sort()
+        r = {
+            "ms_min": round(tempos[0], 3),
+            "ms_mediana": round(statistics.median(tempos), 3),
+            "ms_p95": round(tempos[min(len(tempos) - 1, int(0.95 * len(tempos)))], 3),
+        }
+        if self.conn is not None:
+            n = self.repeticoes
+            r["chamadas_remotas"] = {k: v / n for k, v in sorted(self.conn.chamadas.items())}
+            r["bytes_enviados"] = self.conn.bytes_enviados / n
+            r["bytes_recebidos"] = self.conn.bytes_recebidos / n
+        self.resultados[nome] = r
+        print(f"{nome:<34}{r['ms_mediana']:>10.2f} ms  (p95 {r['ms_p95']:.2f})")
+
+
+def executar(args):
+    df_planilha = gerar_planilha(args.motoristas, args.anos, semente=args.semente)
+    conn = ConexaoLocal(df=df_planilha, latencia=args.latencia)
+    if args.backend == "sqlite":
+        arm = ArmazenamentoSQLite(os.path.join(tempfile.mkdtemp(), "bench.db"))
+        arm.anexar_varios(normalizar(df_planilha.copy()).to_dict('records'))
+        medidor_conn = None
+    else:
+        arm = ArmazenamentoPlanilha(conn)
+        medidor_conn = conn
+    cpf = cpf_sintetico(0)
+    m = Medidor(medidor_conn, args.repeticoes)
+    print(f"{len(df_planilha)} linhas, {args.motoristas} motoristas x {args.anos} anos, backend={args.backend}, latência={args.latencia}s")
+
+    # --- Leitura ---
+    def carregar(cpf=cpf):
+        df, marca = arm.carregar_com_marca(cpf)
+        return DadosMotorista.de_registros(df), marca
+    m.medir("carregar_dados (frio)", carregar)
+
+    cache = CacheMotorista(carregar, ttl=None)
+    cache.obter(cpf)
+    m.medir("carregar_dados (cache)", lambda: cache.obter(cpf))
+    dados, marca = carregar()
+
+    df_total = normalizar(conn.read())
+    memoria = {"planilha_mib": round(df_total.memory_usage(deep=True).sum() / 2**20, 2),
+               "motorista_kib": round(dados.registros.memory_usage(deep=True).sum() / 2**10, 1)}
+    print(f"memória: planilha normalizada {memoria['planilha_mib']} MiB, um motorista {memoria['motorista_kib']} KiB")
+    m.medir("filtro CPF (planilha inteira)", lambda: df_total[(df_total['CPF'] == cpf) & (df_total['Status'] != 'Lixeira')])
+    m.medir("filtro ativos (só o CPF)", lambda: dados.registros[dados.registros['Status'] != 'Lixeira'])
+    df_user = dados.registros[dados.registros['Status'] != 'Lixeira']
+
+    # "KM Inicial" da aba LANÇAR sai do índice mantido no cache; recalcular é o caminho da exclusão da última leitura
+    m.medir("hodômetro (último KM, índice)", lambda: dados.odometro.km)
+    m.medir("hodômetro (recalcular)", lambda: ultima_leitura(df_user))
+    m.medir("hodômetro (verificar continuidade)", lambda: verificar(df_user))
+    # O dashboard lê a conferência guardada no cache; refaz só quando a sincronização traz ou exclui lançamentos
+    m.medir("hodômetro (conferência, cache)", lambda: dados.conferencia_km)
+    # Aba LANÇAR sem os lançamentos em cache: só as colunas da última leitura
+    m.medir("hodômetro (ultimo_odometro, frio)", lambda: arm.ultimo_odometro(cpf))
+
+    # --- Dashboard ---
+    ultimo = dados.rollup.ultimo_dia(pd.Timestamp.now())
+    ano, mes = ultimo.year, ultimo.month
+
+    def dashboard(ano=ano, mes=mes):
+        df_f = colunas_calculadas(filtrar_periodo(indexar_por_data(df_user), ano=ano, mes=mes))
+        return df_f, totais_agregado(dados.rollup.periodo(ano=ano, mes=mes))
+    m.medir("dashboard (mês)", dashboard)
+    m.medir("dashboard (todos)", lambda: dashboard(None, None))
+
+    def frames_graficos():
+        # Gráficos saem do agregado diário, em baldes de dia/semana/mês
+        diario = dados.rollup.dias()
+        return agrupar_no_tempo(diario)[0], participacao_apps(diario)
+    m.medir("frames dos gráficos (todos)", frames_graficos)
+
+    try:
+        import plotly.express as px
+    except ImportError:
+        px = None
+    if px is not None:
+        g, apps = frames_graficos()
+        m.medir("figuras plotly (todos)", lambda: (
+            px.pie(apps, values='Valor', names='App', hole=0.4),
+            px.bar(g, x='Periodo', y=['Receita', 'Lucro'], barmode='group', text_auto='.2s'),
+            px.bar(g, x='Periodo', y=['Fat_KM', 'Lucro_KM'], barmode='group')))
+
+    # --- Escrita (gravação + sincronização que a recarga faz) ---
+    estado = {"dados": dados, "marca": marca}
+
+    def salvar():
+        arm.anexar(novo_registro(cpf, ultimo))
+        df, estado["marca"] = arm.sincronizar(cpf, estado["dados"].registros, estado["marca"])
+        estado["dados"] = estado["dados"].avancar(df)
+    m.medir("salvar + sincronizar", salvar)
+
+    if args.backend == "planilha":
+        # Outro processo grava entre a contagem de linhas e o append: a linha vai para baixo da dele, nada é sobrescrito
+        def salvar_concorrente():
+            outro, meu = novo_registro(cpf_sintetico(1), ultimo), novo_registro(cpf, ultimo)
+            conn.injetar_concorrente([outro])
+            gravacao = arm.anexar(meu)
+            assert gravacao.concorrente, gravacao
+            assert [l[0] for l in conn.valores[gravacao.linha - 2:gravacao.linha]] == [outro['ID_Unico'], meu['ID_Unico']]
+        m.medir("salvar com concorrente", salvar_concorrente)
+
+    def excluir(id_unico):
+        arm.marcar_lixeira(id_unico)
+        df, estado["marca"] = arm.sincronizar(cpf, estado["dados"].registros, estado["marca"])
+        estado["dados"] = estado["dados"].avancar(df)
+    ativos = iter(df_user['ID_Unico'].tolist())
+    m.medir("excluir + sincronizar", excluir, preparar=lambda: next(ativos))
+
+    return {
+        "meta": {
+            "quando": datetime.now().isoformat(timespec="seconds"),
+            "git": _versao_git(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "linhas": len(df_planilha),
+            "linhas_motorista": len(dados.registros),
+            **{k: getattr(args, k) for k in ("motoristas", "anos", "backend", "latencia", "repeticoes", "semente")},
+        },
+        "memoria": memoria,
+        "resultados": m.resultados,
+    }
+
+
+def comparar(atual, anterior_caminho):
+    with open(anterior_caminho, encoding="utf-8") as f:
+        anterior = json.load(f)
+    print(f"\nComparação com {anterior_caminho} ({anterior['meta'].get('git', '?')}):")
+    for nome, r in atual["resultados"].items():
+        antes = anterior["resultados"].get(nome)
+        if not antes: continue
+        razao = r["ms_mediana"] / antes["ms_mediana"] if antes["ms_mediana"] else float("inf")
+        # Ignora ruído de caminhos sub-milissegundo
+        alerta = "  <-- regressão" if razao > 1.2 and r["ms_mediana"] - antes["ms_mediana"] > 0.5 else ""
+        print(f"{nome:<34}{antes['ms_mediana']:>10.2f} -> {r['ms_mediana']:>10.2f} ms  ({razao:.2f}x){alerta}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--motoristas", type=int, default=100)
+    ap.add_argument("--anos", type=float, default=2)
+    ap.add_argument("--backend", choices=["planilha", "sqlite"], default="planilha")
+    ap.add_argument("--latencia", type=float, default=0.0, help="segundos por chamada remota simulada")
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--semente", type=int, default=0)
+    ap.add_argument("--saida", default="bench_carga.json")
+    ap.add_argument("--comparar", help="JSON de uma execução anterior")
+    args = ap.parse_args()
+
+    resultado = executar(args)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados em {args.saida}")
+    if args.comparar: comparar(resultado, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
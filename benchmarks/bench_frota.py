@@ -0,0 +1,88 @@
+"""Benchmark do relatório da frota: milhares de motoristas, anos de histórico.
+
+    python benchmarks/bench_frota.py --motoristas 2000 --anos 2
+
+Mede a carga completa (SQLite, ``cpf=None``), a tabela (CPF, mês), os
+recortes do painel (ranking, por app, mês a mês) e a sincronização
+incremental com e sem novidades, conferindo o incremental contra o
+recálculo completo.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd  # noqa: E402
+
+from armazenamento import ArmazenamentoSQLite  # noqa: E402
+from dados_sinteticos import gerar_planilha, cpf_sintetico  # noqa: E402
+from esquema import COLS_RECEITA, gerar_id  # noqa: E402
+from frota import RelatorioFrota, agregar_mensal, evolucao, exportar_xlsx, filtrar, por_app, ranking  # noqa: E402
+
+
+def medir(nome, funcao, repeticoes=1):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    print(f"{nome:<40}{min(tempos):>10.1f} ms")
+    return resultado
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--motoristas", type=int, default=2000)
+    ap.add_argument("--anos", type=int, default=2)
+    ap.add_argument("--semente", type=int, default=0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        armazenamento = ArmazenamentoSQLite(os.path.join(pasta, "frota.db"))
+        bruto = medir("gerar planilha sintética", lambda: gerar_planilha(args.motoristas, args.anos, semente=args.semente))
+        medir("gravar no SQLite", lambda: armazenamento.anexar_varios(bruto.to_dict('records')))
+        print(f"{len(bruto)} lançamentos, {args.motoristas} motoristas")
+
+        df, marca = medir("carregar_com_marca(None)", lambda: armazenamento.carregar_com_marca(None))
+        print(f"  {df.memory_usage(deep=True).sum() / 2**20:.1f} MiB em memória")
+        relatorio = medir("tabela (CPF, mês)", lambda: RelatorioFrota.de_registros(df))
+        print(f"  {len(relatorio.mensal)} linhas, {relatorio.mensal.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+
+        ano = relatorio.anos()[0]
+        for rotulo, recorte in [("todos", relatorio.mensal), ("ano", filtrar(relatorio.mensal, ano)),
+                                ("mês", filtrar(relatorio.mensal, ano, 3))]:
+            medir(f"ranking + por app + mês a mês ({rotulo})",
+                  lambda: (ranking(recorte, relatorio.nomes), por_app(recorte), evolucao(recorte)), repeticoes=5)
+        recorte = filtrar(relatorio.mensal, ano)
+        tabela = ranking(recorte, relatorio.nomes)
+        xlsx = medir("exportar XLSX (ano)", lambda: exportar_xlsx({"Ranking": tabela, "Por app": por_app(recorte)}))
+        print(f"  {len(xlsx) / 2**10:.0f} KiB")
+
+        # Sincronização sem novidade: o caso de quase todo ttl
+        df2, marca = medir("sincronizar(None) sem novidade", lambda: armazenamento.sincronizar(None, df, marca))
+        medir("avancar sem novidade", lambda: relatorio.avancar(df2))
+
+        # 50 lançamentos novos de motoristas diferentes e 10 na lixeira
+        hoje = df['Data'].max().strftime("%Y-%m-%d")
+        novos = bruto.head(0).reindex(range(50)).assign(
+            ID_Unico=[gerar_id() for _ in range(50)], Status='Ativo', Usuario='Bench', Data=hoje,
+            CPF=[cpf_sintetico(i * 7 % args.motoristas) for i in range(50)], Urbano=250.0, KM_Inicial=1000, KM_Final=1180,
+        ).fillna(0)
+        armazenamento.anexar_varios(novos.to_dict('records'))
+        for id_unico in df.loc[df['Status'] == 'Ativo', 'ID_Unico'].iloc[::len(df) // 10][:10]:
+            armazenamento.marcar_lixeira(id_unico)
+        df3, marca = medir("sincronizar(None) 50 novos + 10 lixeira", lambda: armazenamento.sincronizar(None, df2, marca))
+        atualizado = medir("avancar 50 novos + 10 lixeira", lambda: relatorio.avancar(df3))
+        completo = medir("recalcular tudo (referência)", lambda: agregar_mensal(df3))
+
+        pd.testing.assert_frame_equal(atualizado.mensal, completo, check_exact=False)
+        total = df3.loc[df3['Status'] != 'Lixeira', COLS_RECEITA].astype('float64').to_numpy().sum()
+        assert abs(ranking(atualizado.mensal, atualizado.nomes)['Receita'].sum() - total) < 0.01
+
+
+if __name__ == "__main__":
+    main()
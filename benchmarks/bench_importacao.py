@@ -0,0 +1,108 @@
+"""Benchmark da importação em lote: arquivo de ~50 mil linhas em CSV e XLSX.
+
+    python benchmarks/bench_importacao.py --linhas 50000
+
+Mede tempo e pico de memória (tracemalloc) da leitura em blocos, com metade
+das linhas já existentes (caminho de deduplicação), e compara a limpeza de
+CPF por linha (``apply``) com a vetorizada. Confere também os valores de um
+CSV com ',' e decimais pt-BR entre aspas (exportação do Google Sheets).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd  # noqa: E402
+
+from dados_sinteticos import gerar_planilha  # noqa: E402
+from esquema import COLS_NUM, limpar_cpf, limpar_cpf_serie, normalizar  # noqa: E402
+from importacao import importar  # noqa: E402
+
+
+def arquivo_csv(df):
+    # Formato de exportação brasileiro: ';' e vírgula decimal, datas dd/mm/aaaa
+    saida = df.assign(Data=pd.to_datetime(df['Data']).dt.strftime('%d/%m/%Y'))
+    return io.BytesIO(saida.to_csv(sep=';', decimal=',', index=False).encode('utf-8'))
+
+
+def arquivo_xlsx(df):
+    from openpyxl import Workbook
+    livro = Workbook(write_only=True)
+    aba = livro.create_sheet()
+    aba.append(list(df.columns))
+    saida = df.assign(Data=pd.to_datetime(df['Data']))
+    for linha in saida.itertuples(index=False): aba.append([v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in linha])
+    buffer = io.BytesIO()
+    livro.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def conferir_csv_virgula():
+    # Exportação pt-BR do Google Sheets: separador ',' e "150,50" entre aspas; "1,234" não dá para decidir
+    texto = ('CPF,Data,Urbano,Energia,KM Inicial,KM Final\n'
+             '12345678901,01/03/2024,"150,50","1.234,56",1000,1200\n'
+             '12345678901,02/03/2024,99.9,"1,234.50",1200,1300\n'
+             '12345678901,03/03/2024,"1,234",10,1300,1400\n')
+    registros, resultado = importar(io.BytesIO(texto.encode('utf-8')), "extrato.csv", normalizar(pd.DataFrame()))
+    valores = [(r['Urbano'], r['Energia']) for r in registros]
+    assert valores == [(150.5, 1234.56), (99.9, 1234.5)], valores
+    assert resultado.invalidas == 1, resultado
+    print(f"CSV com ',' e decimais pt-BR: {valores}, {resultado.invalidas} ambígua")
+
+
+def medir(nome, funcao, memoria=True, preparar=None):
+    # Tempo sem tracemalloc (que deixa o Python várias vezes mais lento); pico numa segunda execução
+    if preparar: preparar()
+    t0 = time.perf_counter()
+    resultado = funcao()
+    ms = (time.perf_counter() - t0) * 1000
+    pico = ""
+    if memoria:
+        if preparar: preparar()
+        tracemalloc.start()
+        funcao()
+        pico = f"   pico {tracemalloc.get_traced_memory()[1] / 2**20:>7.1f} MiB"
+        tracemalloc.stop()
+    print(f"{nome:<34}{ms:>10.1f} ms{pico}")
+    return resultado
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--linhas", type=int, default=50_000)
+    ap.add_argument("--semente", type=int, default=0)
+    args = ap.parse_args()
+
+    motoristas = max(args.linhas // 620, 1)
+    df = gerar_planilha(motoristas, 2, semente=args.semente).head(args.linhas)
+    df = df[df['Status'] == 'Ativo'].drop(columns=['ID_Unico', 'Status'])
+    existentes = normalizar(df.iloc[: len(df) // 2].assign(ID_Unico="", Status="Ativo"))
+    print(f"{len(df)} linhas, {motoristas} motoristas, {len(existentes)} já existentes")
+
+    csv = arquivo_csv(df)
+    print(f"CSV {len(csv.getvalue()) / 2**20:.1f} MiB")
+    registros, resultado = medir("importar CSV", lambda: importar(csv, "extrato.csv", existentes), preparar=lambda: csv.seek(0))
+    print(f"  {resultado}")
+    assert resultado.novas + resultado.duplicadas == len(df) and resultado.duplicadas >= len(existentes)
+    del registros
+
+    xlsx = medir("gerar XLSX (openpyxl)", lambda: arquivo_xlsx(df), memoria=False)
+    registros, resultado = medir("importar XLSX", lambda: importar(xlsx, "extrato.xlsx", existentes), preparar=lambda: xlsx.seek(0))
+    print(f"  {resultado}")
+
+    cpfs = df['CPF'].astype(float)
+    medir("limpar_cpf (apply)", lambda: cpfs.apply(limpar_cpf))
+    medir("limpar_cpf_serie", lambda: limpar_cpf_serie(cpfs))
+    assert (cpfs.apply(limpar_cpf) == limpar_cpf_serie(cpfs)).all()
+    assert set(COLS_NUM) <= set(registros[0])
+    conferir_csv_virgula()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark do início: primeira pintura do login e de cada aba, cada uma num processo novo.
+
+    python benchmarks/bench_inicio.py --motoristas 50 --anos 2
+    python benchmarks/bench_inicio.py --limite login=800 --limite lancar=1500
+
+Cada cenário roda o app.py pelo ``AppTest`` num interpretador novo (imports e
+caches frios) contra uma ``ConexaoLocal`` com a planilha sintética, e mede o
+primeiro rerun, as chamadas à planilha e os módulos pesados importados (o
+Streamlit já traz o ``plotly.graph_objects``; o que o app adia é o
+``plotly.express`` e o ``streamlit_gsheets``). Confere o que o início não
+pode voltar a fazer:
+
+- login: nenhuma chamada à planilha, nada de Plotly Express nem gsheets;
+- LANÇAR: o "KM Inicial" certo lendo só as colunas do hodômetro (sem ``read``
+  da aba inteira) e nada de Plotly;
+- DASHBOARD: Plotly só depois de ligar a "Visão Gráfica".
+
+Termina com código 1 se alguma conferência falhar ou um ``--limite`` (ms da
+mediana) for passado.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CENARIOS = ["login", "lancar", "dashboard", "graficos"]
+CPF = 0
+
+
+def _entrar(at, usuario, cpf):
+    for chave, valor in {'autenticado': True, 'usuario': usuario, 'cpf_usuario': cpf}.items(): at.session_state[chave] = valor
+
+
+def rodar_cenario(nome):
+    """Roda dentro do processo filho e imprime o resultado em JSON."""
+    from streamlit.testing.v1 import AppTest
+
+    from dados_sinteticos import cpf_sintetico
+    from instrumentacao import COLETOR
+
+    at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=120)
+    if nome != "login": _entrar(at, "Bench", cpf_sintetico(CPF))
+    if nome in ("dashboard", "graficos"): at.session_state['nav_main'] = "📊 DASHBOARD"
+    t0 = time.perf_counter()
+    at.run()
+    ms = (time.perf_counter() - t0) * 1000
+    if nome == "graficos":
+        # Medido só o rerun que liga os gráficos (o dashboard já está aberto)
+        t0 = time.perf_counter()
+        at.toggle(key="ver_graficos").set_value(True).run()
+        ms = (time.perf_counter() - t0) * 1000
+
+    # Contadores somados nos reruns: abrir a aba conta como as duas chamadas que o cliente faz
+    contadores = COLETOR.reruns_df().filter(like="remoto.").fillna(0).sum()
+    remotas = {k: int(v) for k, v in contadores.items() if v and "bytes" not in k and k != "remoto.chamadas"}
+    resultado = {
+        "ms": round(ms, 1), "remotas": remotas, "chamadas": int(contadores.get("remoto.chamadas", 0)),
+        "plotly": "plotly.express" in sys.modules, "gsheets": "streamlit_gsheets" in sys.modules,
+        "excecao": [str(e.value) for e in at.exception],
+    }
+    if nome == "lancar": resultado["km_inicial"] = at.number_input(key="km_inicial_input").value
+    if nome == "graficos": resultado["graficos"] = len(at.get("plotly_chart"))
+    print(json.dumps(resultado))
+
+
+def medir(nome, planilha, repeticoes):
+    execucoes = []
+    for _ in range(repeticoes):
+        env = dict(os.environ, BYD_PLANILHA_LOCAL=planilha, BYD_FILA=tempfile.mktemp(suffix=".db"), BYD_ARMAZENAMENTO="planilha")
+        saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--cenario", nome],
+                               env=env, cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+        execucoes.append(json.loads(saida.strip().splitlines()[-1]))
+    resultado = execucoes[-1] | {"ms": statistics.median(e["ms"] for e in execucoes), "ms_todas": [e["ms"] for e in execucoes]}
+    chamadas = (f"{resultado['chamadas']} (" + ", ".join(f"{k.removeprefix('remoto.')}={v}" for k, v in sorted(resultado["remotas"].items())) + ")"
+                if resultado["chamadas"] else "nenhuma")
+    print(f"{nome:<12}{resultado['ms']:>10.1f} ms   plotly={'sim' if resultado['plotly'] else 'não':<4}chamadas: {chamadas}")
+    return resultado
+
+
+def conferir(resultados, esperado_km):
+    falhas = []
+    for nome, r in resultados.items():
+        if r["excecao"]: falhas.append(f"{nome}: exceção {r['excecao']}")
+    login, lancar, dashboard, graficos = (resultados[n] for n in CENARIOS)
+    if login["chamadas"]: falhas.append(f"login: chamou a planilha {login['remotas']}")
+    if login["plotly"]: falhas.append("login: importou o Plotly")
+    if login["gsheets"]: falhas.append("login: importou o streamlit_gsheets")
+    if "remoto.read" in lancar["remotas"]: falhas.append("lancar: leu a aba inteira")
+    if lancar["plotly"]: falhas.append("lancar: importou o Plotly")
+    if lancar["km_inicial"] != esperado_km: falhas.append(f"lancar: KM Inicial {lancar['km_inicial']}, esperado {esperado_km}")
+    if dashboard["plotly"]: falhas.append("dashboard: importou o Plotly sem a Visão Gráfica")
+    if not graficos["graficos"]: falhas.append("graficos: nenhum gráfico desenhado")
+    return falhas
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--motoristas", type=int, default=50)
+    ap.add_argument("--anos", type=float, default=2)
+    ap.add_argument("--repeticoes", type=int, default=3)
+    ap.add_argument("--semente", type=int, default=0)
+    ap.add_argument("--limite", action="append", default=[], metavar="CENARIO=MS",
+                    help="falha se a mediana do cenário passar de MS (pode repetir)")
+    ap.add_argument("--cenario", choices=CENARIOS, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.cenario: return rodar_cenario(args.cenario)
+
+    from dados_sinteticos import cpf_sintetico, gerar_planilha
+    from esquema import normalizar
+    from odometro import ultima_leitura
+
+    limites = {nome: float(ms) for nome, ms in (item.split("=", 1) for item in args.limite)}
+    with tempfile.TemporaryDirectory() as pasta:
+        planilha = os.path.join(pasta, "planilha.csv")
+        df = gerar_planilha(args.motoristas, args.anos, semente=args.semente)
+        df.to_csv(planilha, index=False)
+        esperado_km = ultima_leitura(normalizar(df.copy(), cpf_sintetico(CPF))).km
+        print(f"{len(df)} linhas, {args.motoristas} motoristas x {args.anos} anos, {args.repeticoes} processo(s) por cenário")
+        resultados = {nome: medir(nome, planilha, args.repeticoes) for nome in CENARIOS}
+
+    falhas = conferir(resultados, esperado_km)
+    falhas += [f"{nome}: {resultados[nome]['ms']:.0f} ms acima do limite de {ms:.0f} ms"
+               for nome, ms in limites.items() if resultados[nome]["ms"] > ms]
+    for falha in falhas: print(f"FALHA {falha}")
+    if falhas: sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Micro-benchmark: cálculos inline do dashboard antigo x módulo ``metricas``.
+
+    python benchmarks/bench_metricas.py --linhas 200000
+
+Os dois lados recebem o mesmo frame sintético e fazem o mesmo trabalho do
+dashboard: filtro de ano/mês, colunas por lançamento, totais, faturamento
+por app e eficiência por km. Os resultados são conferidos antes de medir.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from esquema import COLS_RECEITA, COLS_CUSTO  # noqa: E402
+from metricas import indexar_por_data, filtrar_periodo, colunas_calculadas, participacao_apps, por_km, totais  # noqa: E402
+
+
+def frame_sintetico(linhas, semente=0):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({c: rng.gamma(2.0, 40.0, linhas).round(2) for c in COLS_RECEITA + COLS_CUSTO})
+    df['KM_Inicial'] = rng.integers(10_000, 200_000, linhas).astype(float)
+    df['KM_Final'] = df['KM_Inicial'] + rng.integers(0, 400, linhas)
+    df['Data'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 365 * 7, linhas), unit='D')
+    return df
+
+
+def inline(df, ano, mes):
+    # Cópia fiel do código que ficava no app.py
+    df_bi = df.copy().sort_values('Data', ascending=False)
+    df_f = df_bi.copy()
+    if ano is not None: df_f = df_f[df_f['Data'].dt.year == ano]
+    if mes is not None: df_f = df_f[df_f['Data'].dt.month == mes]
+    df_f = df_f.sort_values(by='Data', ascending=False)
+    df_f['Receita'] = df_f[['Urbano', 'Boraali', 'app163', 'Outros_Receita']].sum(axis=1)
+    df_f['Custos'] = df_f[['Energia', 'Manuten', 'Seguro', 'Outros_Custos', 'Aplicativo', 'Alimentacao']].sum(axis=1)
+    df_f['Lucro'] = df_f['Receita'] - df_f['Custos']
+    df_f['Km rodados'] = (df_f['KM_Final'] - df_f['KM_Inicial']).clip(lower=0)
+    tot = (df_f['Receita'].sum(), df_f['Custos'].sum(), df_f['Lucro'].sum(), df_f['Km rodados'].sum())
+    apps = df_f[['Urbano', 'Boraali', 'app163', 'Outros_Receita']].sum().reset_index()
+    apps.columns = ['App', 'Valor']
+    apps = apps[apps['Valor'] > 0]
+    g = df_f.sort_values('Data')
+    g['Fat_KM'] = g.apply(lambda x: x['Receita']/x['Km rodados'] if x['Km rodados'] > 0 else 0, axis=1)
+    g['Lucro_KM'] = g.apply(lambda x: x['Lucro']/x['Km rodados'] if x['Km rodados'] > 0 else 0, axis=1)
+    return tot, apps, g
+
+
+def vetorizado(df_idx, ano, mes):
+    g = colunas_calculadas(filtrar_periodo(df_idx, ano=ano, mes=mes))
+    tot = totais(g, km='Km rodados')
+    apps = participacao_apps(g)
+    km_linha = g['Km rodados'].to_numpy()
+    g = g.assign(Fat_KM=por_km(g['Receita'].to_numpy(), km_linha), Lucro_KM=por_km(g['Lucro'].to_numpy(), km_linha))
+    return tot, apps, g
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--linhas", type=int, default=200_000)
+    ap.add_argument("--repeticoes", type=int, default=3)
+    args = ap.parse_args()
+
+    df = frame_sintetico(args.linhas)
+    df_idx = indexar_por_data(df)
+    cenarios = {"ano+mês": (2023, 5), "ano": (2023, None), "mês (todos os anos)": (None, 5), "todos": (None, None)}
+
+    print(f"{args.linhas} lançamentos, melhor de {args.repeticoes}")
+    print(f"{'filtro':<22}{'inline (s)':>12}{'metricas (s)':>14}{'ganho':>9}")
+    for nome, (ano, mes) in cenarios.items():
+        a, b = inline(df, ano, mes), vetorizado(df_idx, ano, mes)
+        assert np.allclose(a[0], b[0]) and np.allclose(a[2]['Fat_KM'].sum(), b[2]['Fat_KM'].sum())
+        t_inline = cronometrar(lambda: inline(df, ano, mes), args.repeticoes)
+        t_vet = cronometrar(lambda: vetorizado(df_idx, ano, mes), args.repeticoes)
+        print(f"{nome:<22}{t_inline:>12.4f}{t_vet:>14.4f}{t_inline / t_vet:>8.0f}x")
+    t_indice = cronometrar(lambda: indexar_por_data(df), args.repeticoes)
+    print(f"indexar_por_data (uma vez por carga): {t_indice:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Planilha sintética no esquema ``COLUNAS_OFICIAIS`` para os benchmarks.
+
+Cada motorista roda em ~85% dos dias, com hodômetro contínuo, receitas
+concentradas nos apps urbanos, energia proporcional ao km, custos fixos
+esporádicos (seguro, mensalidades) e ~2% dos lançamentos na lixeira.
+"""
+import numpy as np
+import pandas as pd
+
+from esquema import COLUNAS_OFICIAIS, id_no_instante
+
+
+def cpf_sintetico(i):
+    return f"{10_000_000_000 + i * 7919:011d}"[-11:]
+
+
+def gerar_planilha(motoristas=50, anos=2, inicio="2023-01-01", semente=0):
+    rng = np.random.default_rng(semente)
+    dias = pd.date_range(inicio, periods=int(365 * anos), freq="D")
+    partes = []
+    for m in range(motoristas):
+        datas = dias[rng.random(len(dias)) < 0.85]
+        n = len(datas)
+        km = rng.integers(80, 320, n).astype(float)
+        km_final = rng.integers(5_000, 90_000) + np.cumsum(km)
+        urbano = (km * rng.uniform(1.6, 2.4, n)).round(2)
+        parte = pd.DataFrame({
+            'Status': np.where(rng.random(n) < 0.02, 'Lixeira', 'Ativo'),
+            'Usuario': f"Motorista {m:04d}",
+            'CPF': cpf_sintetico(m),
+            'Data': datas.strftime("%Y-%m-%d"),
+            'Urbano': urbano,
+            'Boraali': np.where(rng.random(n) < 0.4, rng.gamma(2.0, 25.0, n), 0.0).round(2),
+            'app163': np.where(rng.random(n) < 0.2, rng.gamma(2.0, 20.0, n), 0.0).round(2),
+            'Outros_Receita': np.where(rng.random(n) < 0.05, rng.gamma(2.0, 30.0, n), 0.0).round(2),
+            'Energia': (km * rng.uniform(0.12, 0.2, n)).round(2),
+            'Manuten': np.where(rng.random(n) < 0.03, rng.gamma(2.0, 150.0, n), 0.0).round(2),
+            'Seguro': np.where(datas.day == 10, 320.0, 0.0),
+            'Aplicativo': np.where(datas.day == 5, 49.9, 0.0),
+            'Alimentacao': np.where(rng.random(n) < 0.6, rng.gamma(2.0, 12.0, n), 0.0).round(2),
+            'Outros_Custos': np.where(rng.random(n) < 0.02, rng.gamma(2.0, 80.0, n), 0.0).round(2),
+            'KM_Inicial': km_final - km,
+            'KM_Final': km_final,
+            'Detalhes': "",
+        })
+        # ULIDs com o instante do lançamento (ordem temporal preservada)
+        ms = (((datas - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy() + rng.integers(0, 86_400_000, n)).tolist()
+        # 80 bits aleatórios montados com 16 sorteios de 5 bits (inteiros do Python: passa de 64 bits)
+        aleatorio = (rng.integers(0, 32, (n, 16)).astype(object) * [1 << 5 * i for i in range(15, -1, -1)]).sum(axis=1)
+        parte['ID_Unico'] = [id_no_instante(t, a) for t, a in zip(ms, aleatorio)]
+        partes.append(parte)
+    df = pd.concat(partes, ignore_index=True)
+    # A planilha real cresce por append: linhas na ordem em que foram lançadas
+    df = df.sort_values('Data', kind='stable').reset_index(drop=True)
+    return df[COLUNAS_OFICIAIS]
@@ -0,0 +1,88 @@
+"""Cache em memória dos lançamentos, uma entrada por CPF.
+
+Substitui o ``st.cache_data`` global: depois de uma gravação só a entrada do
+motorista afetado é tocada, e as demais sessões continuam servindo da
+memória. Acima de ``max_motoristas``, a entrada menos usada recentemente sai.
+
+Cada entrada guarda o DataFrame e a marca d'água do armazenamento. Passado o
+``ttl`` (ou após ``expirar``), a próxima leitura chama ``sincronizar`` e
+traz só o que mudou desde a marca; sem ``sincronizar`` recarrega tudo.
+
+Os DataFrames devolvidos são compartilhados entre sessões: não alterar.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentacao import contar
+
+
+class CacheMotorista:
+    def __init__(self, carregar, sincronizar=None, max_motoristas=256, ttl=60.0):
+        """``carregar(cpf) -> (df, marca)``; ``sincronizar(cpf, df, marca) -> (df, marca)``."""
+        self._carregar = carregar
+        self._sincronizar = sincronizar
+        self.max_motoristas = max_motoristas
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._geracao = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.sincronizacoes = 0
+        self.despejos = 0
+
+    def obter(self, cpf):
+        agora = time.monotonic()
+        with self._trava:
+            item = self._dados.get(cpf)
+            if item is not None and (self.ttl is None or agora - item[0] < self.ttl):
+                self._dados.move_to_end(cpf)
+                self.acertos += 1
+                contar("cache.acerto")
+                return item[1]
+            sincronizar = item is not None and self._sincronizar is not None
+            if sincronizar: self.sincronizacoes += 1
+            else: self.falhas += 1
+            contar("cache.sincronizacao" if sincronizar else "cache.falha")
+            geracao = self._geracao.get(cpf, 0)
+
+        # Carrega fora da trava para não segurar as outras sessões durante o I/O
+        if sincronizar: df, marca = self._sincronizar(cpf, item[1], item[2])
+        else: df, marca = self._carregar(cpf)
+        with self._trava:
+            # Expirado durante a leitura: devolve, mas não guarda dado possivelmente velho
+            if self._geracao.get(cpf, 0) != geracao: return df
+            self._dados[cpf] = (time.monotonic(), df, marca)
+            self._dados.move_to_end(cpf)
+            while len(self._dados) > self.max_motoristas:
+                self._dados.popitem(last=False)
+                self.despejos += 1
+        return df
+
+    def espiar(self, cpf):
+        """O valor em cache se ainda está válido (dentro do ``ttl`` e não expirado); None sem carregar nada."""
+        with self._trava:
+            item = self._dados.get(cpf)
+            if item is None or (self.ttl is not None and time.monotonic() - item[0] >= self.ttl): return None
+            return item[1]
+
+    def expirar(self, cpf):
+        """Força sincronizar na próxima leitura, mantendo o frame e a marca atuais."""
+        with self._trava:
+            item = self._dados.get(cpf)
+            if item is not None: self._dados[cpf] = (float("-inf"),) + item[1:]
+            # Uma leitura em andamento pode ter começado antes da gravação
+            self._geracao[cpf] = self._geracao.get(cpf, 0) + 1
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas + self.sincronizacoes
+            return {
+                "motoristas": len(self._dados),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "sincronizacoes": self.sincronizacoes,
+                "despejos": self.despejos,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+            }
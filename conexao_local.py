@@ -0,0 +1,198 @@
+"""Conexão local que imita a GSheetsConnection, para rodar sem Google Sheets.
+
+Expõe ``read``/``update`` como a conexão real e, em
+``client._select_worksheet()``, uma aba com o pedaço da API do gspread usado
+na gravação (``row_values``, ``col_values``, ``get``, ``append_rows``,
+``update_cell``, ``batch_update``). Cada chamada
+pode ter latência simulada e é contada em ``chamadas``/``bytes_*``, o que
+permite medir o custo de salvar e reproduzir gravações concorrentes offline.
+
+    conn = ConexaoLocal(latencia=0.3)                 # só memória
+    conn = ConexaoLocal("planilha.csv")               # persiste em CSV
+    conn.injetar_concorrente([{...}])                 # outro motorista grava antes do próximo append
+"""
+import csv
+import io
+import os
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+from esquema import letra_coluna
+
+
+def _para_texto(valor):
+    if valor is None: return ""
+    try:
+        if pd.isna(valor): return ""
+    except (TypeError, ValueError):
+        pass
+    return str(valor)
+
+
+class AbaLocal:
+    """Aba em memória com a mesma assinatura dos métodos do gspread.Worksheet usados pelo app."""
+
+    title = "Pagina1"
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def row_values(self, row):
+        conn = self._conexao
+        with conn._trava:
+            conn._registrar("row_values")
+            if row > len(conn.valores): return []
+            return list(conn.valores[row - 1])
+
+    def get(self, range_name, **kwargs):
+        # Só o formato usado pelo app: "A<linha inicial>:<coluna final>" até o fim da aba
+        conn = self._conexao
+        inicio = int(range_name.split(":")[0][1:])
+        with conn._trava:
+            conn._registrar("get")
+            linhas = [list(l) for l in conn.valores[inicio - 1:]]
+            conn.bytes_recebidos += sum(len(v) for l in linhas for v in l)
+            return linhas
+
+    def col_values(self, col, **kwargs):
+        conn = self._conexao
+        with conn._trava:
+            conn._registrar("col_values")
+            valores = [linha[col - 1] if col <= len(linha) else "" for linha in conn.valores]
+            # Igual ao gspread: descarta as células vazias do final
+            while valores and valores[-1] == "": valores.pop()
+            conn.bytes_recebidos += sum(len(v) for v in valores)
+            return valores
+
+    def append_rows(self, values, value_input_option="RAW", table_range=None):
+        conn = self._conexao
+        with conn._trava:
+            pendentes, conn._concorrentes = conn._concorrentes, []
+            for linha in pendentes: conn._anexar(linha)
+            conn._registrar("append_rows")
+            inicio = len(conn.valores) + 1
+            for linha in values: conn._anexar([_para_texto(v) for v in linha])
+            fim = len(conn.valores)
+            largura = max((len(l) for l in values), default=1)
+            conn.bytes_enviados += sum(len(_para_texto(v)) for l in values for v in l)
+            conn._persistir()
+            return {"updates": {"updatedRange": f"{self.title}!A{inicio}:{letra_coluna(largura)}{fim}",
+                                "updatedRows": len(values)}}
+
+    def update_cell(self, row, col, value):
+        conn = self._conexao
+        with conn._trava:
+            conn._registrar("update_cell")
+            linha = conn.valores[row - 1]
+            if col > len(linha): linha.extend([""] * (col - len(linha)))
+            linha[col - 1] = _para_texto(value)
+            conn.bytes_enviados += len(linha[col - 1])
+            conn._persistir()
+
+    def batch_update(self, data, **kwargs):
+        # Só células isoladas em A1 ("B12"), como o soft-delete usa
+        conn = self._conexao
+        with conn._trava:
+            conn._registrar("batch_update")
+            for item in data:
+                ref = item["range"]
+                col = sum((ord(c) - 64) * 26 ** i for i, c in enumerate(reversed(ref.rstrip("0123456789"))))
+                row = int(ref[len(ref.rstrip("0123456789")):])
+                linha = conn.valores[row - 1]
+                if col > len(linha): linha.extend([""] * (col - len(linha)))
+                linha[col - 1] = _para_texto(item["values"][0][0])
+                conn.bytes_enviados += len(linha[col - 1])
+            conn._persistir()
+        return {"totalUpdatedCells": len(data)}
+
+
+class _ClienteLocal:
+    def __init__(self, conexao):
+        self._conexao = conexao
+        self._aba = AbaLocal(conexao)
+
+    def _select_worksheet(self, worksheet=None, **kwargs):
+        # Como o cliente gsheets: abre a planilha (open_by_url) e busca os metadados da aba
+        with self._conexao._trava:
+            self._conexao._registrar("open_by_url")
+            self._conexao._registrar("get_worksheet")
+        return self._aba
+
+
+class ConexaoLocal:
+    def __init__(self, caminho=None, df=None, latencia=0.0):
+        self.caminho = caminho
+        self.latencia = latencia
+        self.valores = []
+        self.chamadas = Counter()
+        self.bytes_enviados = 0
+        self.bytes_recebidos = 0
+        self._concorrentes = []
+        self._trava = threading.RLock()
+        self.client = _ClienteLocal(self)
+        if df is not None:
+            self.valores = self._df_para_valores(df)
+        elif caminho and os.path.exists(caminho):
+            with open(caminho, newline="", encoding="utf-8") as f:
+                self.valores = [linha for linha in csv.reader(f)]
+
+    # --- API da GSheetsConnection ---
+    def read(self, worksheet=0, ttl=0, **kwargs):
+        with self._trava:
+            self._registrar("read")
+            if not self.valores: return pd.DataFrame()
+            texto = self._valores_para_csv(self.valores)
+        self.bytes_recebidos += len(texto)
+        # Como o get_as_dataframe (drop_empty_rows=True): linhas em branco da aba somem do frame
+        return pd.read_csv(io.StringIO(texto)).dropna(how='all')
+
+    def update(self, worksheet=0, data=None, **kwargs):
+        with self._trava:
+            self._registrar("update")
+            self.valores = self._df_para_valores(data)
+            self.bytes_enviados += len(self._valores_para_csv(self.valores))
+            self._persistir()
+        return data
+
+    # --- Simulação ---
+    def injetar_concorrente(self, registros):
+        """Agenda linhas de "outro motorista" para entrarem logo antes do próximo append."""
+        with self._trava:
+            cabecalho = self.valores[0] if self.valores else list(registros[0].keys())
+            self._concorrentes.extend([_para_texto(r.get(c, "")) for c in cabecalho] for r in registros)
+
+    def zerar_contadores(self):
+        self.chamadas.clear()
+        self.bytes_enviados = self.bytes_recebidos = 0
+
+    # --- Internos ---
+    def _registrar(self, nome):
+        self.chamadas[nome] += 1
+        if self.latencia: time.sleep(self.latencia)
+
+    def _anexar(self, linha):
+        self.valores.append(linha)
+
+    def _persistir(self):
+        if not self.caminho: return
+        tmp = f"{self.caminho}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self.valores)
+        os.replace(tmp, self.caminho)
+
+    @staticmethod
+    def _df_para_valores(df):
+        if df is None or len(df.columns) == 0: return []
+        texto = df.to_csv(index=False)
+        return [linha for linha in csv.reader(io.StringIO(texto))]
+
+    @staticmethod
+    def _valores_para_csv(valores):
+        saida = io.StringIO()
+        largura = max(len(l) for l in valores)
+        csv.writer(saida).writerows(l + [""] * (largura - len(l)) for l in valores)
+        return saida.getvalue()
+
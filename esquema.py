@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from instrumentacao import span
+
+# Estrutura oficial da planilha (ordem das colunas da aba)
+COLUNAS_OFICIAIS = ['ID_Unico', 'Status', 'Usuario', 'CPF', 'Data', 'Urbano', 'Boraali', 'app163', 'Outros_Receita', 'Energia', 'Manuten', 'Seguro', 'Aplicativo', 'Alimentacao', 'Outros_Custos', 'KM_Inicial', 'KM_Final', 'Detalhes']
+COLS_RECEITA = ['Urbano', 'Boraali', 'app163', 'Outros_Receita']
+COLS_CUSTO = ['Energia', 'Manuten', 'Seguro', 'Outros_Custos', 'Aplicativo', 'Alimentacao']
+COLS_NUM = ['Urbano', 'Boraali', 'app163', 'Outros_Receita', 'Energia', 'Manuten', 'Seguro', 'Aplicativo', 'Alimentacao', 'Outros_Custos', 'KM_Inicial', 'KM_Final']
+COLS_KM = ['KM_Inicial', 'KM_Final']
+
+# Tipos em memória: texto repetido em toda linha vira categoria, dinheiro float32
+# (só guardado assim; as somas são feitas em float64) e hodômetro inteiro em
+# int64 (um KM digitado com dígitos a mais não pode dar a volta no int32)
+STATUS = pd.CategoricalDtype(['Ativo', 'Lixeira'])
+TIPOS = {'Status': STATUS, 'CPF': 'category', 'Usuario': 'category', 'Detalhes': 'category',
+         **{c: 'float32' for c in COLS_RECEITA + COLS_CUSTO}, **{c: 'int64' for c in COLS_KM}}
+
+def limpar_cpf(t):
+    if pd.isna(t) or t == "" or t is None: return ""
+    s = str(t).split('.')[0]
+    s = re.sub(r'\D', '', s)
+    return s.zfill(11)
+
+def limpar_cpf_serie(s):
+    """``limpar_cpf`` na coluna inteira: cada CPF distinto é limpo uma vez (são poucos) e espalhado por código."""
+    codigos, unicos = pd.factorize(s)
+    limpos = np.array([limpar_cpf(u) for u in unicos.tolist()] + [""], dtype=object)  # código -1 (vazio) -> ""
+    return pd.Series(limpos[codigos], index=s.index)
+
+# --- IDs ordenáveis no tempo (ULID: 48 bits de milissegundos + 80 bits aleatórios, base32 Crockford) ---
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ultimo_id = [0, 0]
+_trava_id = threading.Lock()
+
+def _codificar_id(ms, aleatorio):
+    n = (ms << 80) | (aleatorio & ((1 << 80) - 1))
+    return "".join(_CROCKFORD[(n >> (5 * i)) & 31] for i in range(25, -1, -1))
+
+def gerar_id():
+    """Novo ID_Unico. No mesmo milissegundo a parte aleatória é incrementada: IDs do processo nunca repetem e sempre crescem."""
+    with _trava_id:
+        ms = int(time.time() * 1000)
+        if ms <= _ultimo_id[0]: ms, aleatorio = _ultimo_id[0], _ultimo_id[1] + 1
+        else: aleatorio = int.from_bytes(os.urandom(10), 'big')
+        _ultimo_id[:] = [ms, aleatorio]
+    return _codificar_id(ms, aleatorio)
+
+def id_no_instante(ms, aleatorio=0):
+    """ULID do instante ``ms`` com a parte aleatória dada (0: o menor ULID daquele instante)."""
+    return _codificar_id(max(ms, 0), aleatorio)
+
+def ids_em(ids, outros):
+    """Máscara numpy de ``ids`` presentes em ``outros``.
+
+    ``Series.isin`` sobre texto do pyarrow monta o conjunto de busca item a item
+    em Python (segundos com a frota inteira); aqui ele vai direto ao ``is_in``.
+    """
+    presentes = pc.is_in(pa.array(ids, type=pa.string()), value_set=pa.array(outros, type=pa.string()))
+    return np.asarray(pc.fill_null(presentes, False), dtype=bool)
+
+def letra_coluna(n):
+    """Letra da n-ésima coluna da aba (1 -> A, 27 -> AA), para montar intervalos A1."""
+    letras = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        letras = chr(65 + r) + letras
+    return letras
+
+def frame_vazio():
+    df = pd.DataFrame(columns=COLUNAS_OFICIAIS).astype(TIPOS)
+    df['Data'] = pd.to_datetime(df['Data'])
+    return df
+
+def ativos(df):
+    return df[df['Status'] != 'Lixeira']
+
+def para_somar(df):
+    """Receitas, custos e km rodados de cada lançamento em float64, prontos para somar."""
+    return df[COLS_RECEITA + COLS_CUSTO].astype('float64').assign(
+        Km=(df['KM_Final'] - df['KM_Inicial']).clip(lower=0).astype('float64'))
+
+def compactar(df):
+    """Aplica ``TIPOS``. Chamar de novo depois de um concat: categorias diferentes voltam a ser texto."""
+    status = df['Status'].astype(object)
+    # Só 'Lixeira' tem efeito no app; qualquer outro status (inclusive vazio) é ativo
+    if status.dtype != STATUS: df = df.assign(Status=status.where(status == 'Lixeira', 'Ativo'))
+    km = {c: df[c].round() for c in COLS_KM if df[c].dtype.kind == 'f'}
+    if km: df = df.assign(**km)
+    return df.astype(TIPOS)
+
+def normalizar(df, cpf=None):
+    """Tipos que o app espera (``TIPOS``): CPF limpo, números sem NaN, Data como datetime e todas as colunas oficiais.
+
+    Com ``cpf``, as linhas dos outros motoristas saem logo depois da limpeza do
+    CPF, antes das demais conversões.
+    """
+    if df is None or df.empty: return frame_vazio()
+    for col in COLUNAS_OFICIAIS:
+        if col not in df.columns: df[col] = pd.NA
+    with span("normalizar.limpar_cpf"):
+        df['CPF'] = limpar_cpf_serie(df['CPF'])
+    if cpf is not None:
+        df = df[df['CPF'] == cpf]
+        if df.empty: return frame_vazio()
+    # IDs antigos (segundos) chegam como número, ULIDs como texto: tudo vira texto
+    df['ID_Unico'] = df['ID_Unico'].astype('string').fillna("").str.removesuffix('.0').astype(str)
+    for c in COLS_NUM: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0.0)
+    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    df['Detalhes'] = df['Detalhes'].fillna("")
+    return compactar(df)
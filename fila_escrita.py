@@ -0,0 +1,190 @@
+"""Fila de escrita em segundo plano: salvar e excluir respondem na hora.
+
+As operações vão primeiro para uma fila durável em SQLite (sobrevive a um
+restart do servidor) e uma thread do processo as envia ao armazenamento:
+operações seguidas do mesmo tipo viram uma única escrita remota (um append
+com várias linhas, um batch_update com várias células de Status). Se o envio
+falha, o lote volta para a fila com espera exponencial e nada do mesmo CPF
+depois dele é enviado antes, para manter a ordem (a exclusão de um lançamento
+ainda na fila só sai depois do próprio lançamento); os outros motoristas
+seguem. Na repetição, cada CPF vai num lote próprio, então uma linha que
+sempre falha não prende a de ninguém.
+
+Cada lote conta a tentativa antes de ir ao armazenamento. Um anexo que já foi
+tentado (mesmo que o erro tenha sido depois do envio, ou o servidor tenha
+reiniciado antes de tirá-lo da fila) só é reenviado com os IDs que ainda não
+estão lá.
+
+Enquanto não sincronizam, os lançamentos aparecem para o motorista a partir
+da fila (``pendentes``/``sobrepor_pendencias``), marcados como pendentes.
+"""
+import itertools
+import json
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from esquema import compactar, ids_em, normalizar
+from instrumentacao import span
+
+
+class FilaEscrita:
+    def __init__(self, caminho, destino, ao_gravar=None, lote_max=500, agrupar_por=0.3,
+                 espera_base=1.0, espera_max=60.0):
+        """``destino``: Armazenamento; ``ao_gravar(cpfs)`` roda depois de cada lote enviado."""
+        self.caminho = caminho
+        self.destino = destino
+        self.ao_gravar = ao_gravar
+        self.lote_max = lote_max
+        self.agrupar_por = agrupar_por
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.enviados = 0
+        # Lotes que caíram abaixo da linha de outro processo (nada é sobrescrito; só para acompanhar)
+        self.concorrentes = 0
+        self.ultimo_erro = None
+        self._evento = threading.Event()
+        self._parar = threading.Event()
+        with self._abrir() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS fila (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, tipo TEXT NOT NULL, cpf TEXT, id_unico TEXT,
+                registro TEXT, criado REAL, tentativas INTEGER DEFAULT 0, proxima REAL DEFAULT 0, erro TEXT)""")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_fila_cpf ON fila (cpf)")
+        self._thread = threading.Thread(target=self._laco, name="fila-escrita", daemon=True)
+        self._thread.start()
+
+    def _abrir(self):
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    # --- Chamado pelo script (retorna na hora) ---
+    def enfileirar_anexo(self, registro):
+        self.enfileirar_anexos([registro])
+
+    def enfileirar_anexos(self, registros):
+        """Vários lançamentos numa única transação (importação de histórico); saem em lotes de ``lote_max``."""
+        self._inserir(("anexar", r['CPF'], r['ID_Unico'], json.dumps(r, default=str)) for r in registros)
+
+    def enfileirar_lixeira(self, cpf, id_unico):
+        self._inserir([("lixeira", cpf, str(id_unico), None)])
+
+    def _inserir(self, operacoes):
+        agora = time.time()
+        with self._abrir() as db:
+            db.executemany("INSERT INTO fila (tipo, cpf, id_unico, registro, criado) VALUES (?, ?, ?, ?, ?)",
+                           (op + (agora,) for op in operacoes))
+        self._evento.set()
+
+    def pendentes(self, cpf):
+        """Lançamentos ainda não enviados do motorista e IDs com exclusão pendente."""
+        with self._abrir() as db:
+            linhas = db.execute("SELECT tipo, id_unico, registro FROM fila WHERE cpf = ? ORDER BY seq", (cpf,)).fetchall()
+        registros = [json.loads(r) for t, _, r in linhas if t == "anexar"]
+        lixeira = {i for t, i, _ in linhas if t == "lixeira"}
+        return registros, lixeira
+
+    def estado(self):
+        with self._abrir() as db:
+            n, tentativas = db.execute("SELECT COUNT(*), COALESCE(MAX(tentativas), 0) FROM fila").fetchone()
+        return {"pendentes": n, "tentativas": tentativas, "enviados": self.enviados,
+                "concorrentes": self.concorrentes, "ultimo_erro": self.ultimo_erro}
+
+    def drenar(self, timeout=30.0):
+        """Espera a fila esvaziar (benchmarks, desligamento). Retorna se esvaziou."""
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if self.estado()["pendentes"] == 0: return True
+            self._evento.set()
+            time.sleep(0.05)
+        return False
+
+    def parar(self):
+        self._parar.set()
+        self._evento.set()
+        self._thread.join(timeout=5)
+
+    # --- Thread de envio ---
+    def _laco(self):
+        while not self._parar.is_set():
+            self._evento.wait(timeout=self._espera_ate_proxima())
+            self._evento.clear()
+            if self._parar.is_set(): break
+            # Junta cliques próximos no mesmo lote
+            time.sleep(self.agrupar_por)
+            try:
+                while self._processar(): pass
+            except Exception as e:  # nunca derruba a thread
+                self.ultimo_erro = str(e)
+
+    def _espera_ate_proxima(self):
+        with self._abrir() as db:
+            proxima = db.execute("SELECT MIN(proxima) FROM fila").fetchone()[0]
+        if proxima is None: return 5.0
+        return min(max(proxima - time.time(), 0.0), 5.0)
+
+    def _processar(self):
+        """Envia o que está vencido, lote a lote, na ordem. Retorna se ainda há trabalho imediato."""
+        # Uma operação em espera segura só as seguintes do mesmo CPF (a ordem só importa por motorista)
+        with self._abrir() as db:
+            linhas = db.execute(
+                "SELECT seq, tipo, cpf, id_unico, registro, tentativas FROM fila f WHERE NOT EXISTS "
+                "(SELECT 1 FROM fila g WHERE g.cpf = f.cpf AND g.seq <= f.seq AND g.proxima > ?) ORDER BY seq LIMIT ?",
+                (time.time(), self.lote_max)).fetchall()
+        if not linhas: return False
+
+        # Já tentadas vão num lote por CPF: uma linha que sempre falha não adia as outras
+        for (tipo, _), grupo in itertools.groupby(linhas, key=lambda l: (l[1], l[2] if l[5] else None)):
+            grupo = list(grupo)
+            seqs = [l[0] for l in grupo]
+            # Conta a tentativa antes de enviar: se cair depois do envio, a repetição confere o que já chegou
+            with self._abrir() as db:
+                db.executemany("UPDATE fila SET tentativas = tentativas + 1 WHERE seq = ?", [(s,) for s in seqs])
+            try:
+                with span(f"fila.{tipo}"):
+                    if tipo == "anexar": self._enviar_anexos(grupo)
+                    else: self.destino.marcar_lixeira_varios([l[3] for l in grupo])
+            except Exception as e:
+                self._adiar(seqs, max(l[5] for l in grupo) + 1, str(e))
+                return False
+            erro = None
+            if self.ao_gravar:
+                # Já está no armazenamento: falhar aqui não pode devolver o lote à fila
+                try: self.ao_gravar({l[2] for l in grupo})
+                except Exception as e: erro = str(e)
+            with self._abrir() as db:
+                db.executemany("DELETE FROM fila WHERE seq = ?", [(s,) for s in seqs])
+            self.enviados += len(seqs)
+            self.ultimo_erro = erro
+        return len(linhas) == self.lote_max
+
+    def _enviar_anexos(self, grupo):
+        registros = [json.loads(l[4]) for l in grupo]
+        if any(l[5] > 0 for l in grupo):
+            # Repetição: o envio anterior pode ter chegado antes do erro
+            ja = self.destino.existentes([r['ID_Unico'] for r in registros])
+            registros = [r for r in registros if str(r['ID_Unico']) not in ja]
+        if not registros: return
+        gravacao = self.destino.anexar_varios(registros)
+        if gravacao is not None and gravacao.concorrente: self.concorrentes += 1
+
+    def _adiar(self, seqs, tentativas, erro):
+        espera = min(self.espera_base * 2 ** (tentativas - 1), self.espera_max)
+        with self._abrir() as db:
+            db.executemany("UPDATE fila SET tentativas = ?, proxima = ?, erro = ? WHERE seq = ?",
+                           [(tentativas, time.time() + espera, erro, s) for s in seqs])
+        self.ultimo_erro = erro
+
+
+def sobrepor_pendencias(dados, registros, lixeira):
+    """DadosMotorista como se a fila já tivesse sido enviada (agregados ajustados só pela diferença)."""
+    if not registros and not lixeira: return dados
+    df = dados.registros
+    if registros:
+        novos = normalizar(pd.DataFrame(registros))
+        novos = novos[~ids_em(novos['ID_Unico'], df['ID_Unico'])]
+        if not novos.empty: df = compactar(pd.concat([df, novos], ignore_index=True)) if not df.empty else novos
+    if lixeira:
+        df = df.assign(Status=df['Status'].where(~df['ID_Unico'].isin(lixeira), 'Lixeira'))
+    return dados.avancar(df)
@@ -0,0 +1,140 @@
+"""Relatório da frota: todos os motoristas comparados no mesmo período.
+
+A base é um único groupby por (CPF, mês) sobre os lançamentos ativos da frota
+inteira: receita por app, custos, km, dias com lançamento e quantidade de
+lançamentos. Rankings, filtros de ano/mês e a comparação por app saem dessa
+tabela (motoristas x meses linhas), nunca dos lançamentos.
+
+A atualização é incremental na leitura (a sincronização por marca d'água só
+traz as linhas novas e o Status); a tabela em si é reaproveitada quando nada
+mudou e refeita quando mudou. Na frota inteira, achar a diferença por
+ID_Unico como em ``rollups`` custa mais que o próprio groupby.
+"""
+import io
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from esquema import COLS_RECEITA, COLS_CUSTO, ativos, para_somar
+from metricas import por_km
+from odometro import verificar
+
+COLS_FROTA = COLS_RECEITA + COLS_CUSTO + ['Km', 'Dias', 'Lancamentos']
+
+
+def _vazio():
+    indice = pd.MultiIndex.from_arrays([pd.Index([], dtype=str), pd.DatetimeIndex([])], names=['CPF', 'Mes'])
+    return pd.DataFrame(columns=COLS_FROTA, index=indice, dtype='float64')
+
+
+def agregar_mensal(df):
+    """Lançamentos -> uma linha por (CPF, Mes) com as somas, os km e os dias ativos."""
+    df = ativos(df)
+    df = df[df['Data'].notna()]
+    if df.empty: return _vazio()
+    base = para_somar(df).assign(Dia=df['Data'])
+    mes = pd.Series(df['Data'].to_numpy().astype('datetime64[M]').astype(df['Data'].dtype), index=df.index, name='Mes')
+    # CPF categórico: observed=True agrupa só os pares que existem
+    grupos = base.groupby([df['CPF'], mes], observed=True, sort=True)
+    agregado = grupos[COLS_RECEITA + COLS_CUSTO + ['Km']].sum()
+    agregado['Dias'] = grupos['Dia'].nunique().astype('float64')
+    agregado['Lancamentos'] = grupos.size().astype('float64')
+    agregado.index = pd.MultiIndex.from_arrays(
+        [agregado.index.get_level_values('CPF').astype(str), agregado.index.get_level_values('Mes')], names=['CPF', 'Mes'])
+    return agregado
+
+
+def _nomes(df):
+    # Último nome usado por CPF (o motorista pode ter digitado diferente em outro login)
+    ultimos = df.drop_duplicates('CPF', keep='last')
+    return pd.Series(ultimos['Usuario'].astype(str).to_numpy(), index=ultimos['CPF'].astype(str).to_numpy(), name='Motorista')
+
+
+def _na_lixeira(df):
+    return int((df['Status'] == 'Lixeira').sum())
+
+
+class RelatorioFrota(NamedTuple):
+    """O que o cache da frota guarda: lançamentos, a tabela (CPF, mês), o nome de cada CPF e a conferência do hodômetro."""
+    registros: pd.DataFrame
+    mensal: pd.DataFrame
+    nomes: pd.Series
+    odometro: pd.DataFrame
+
+    @classmethod
+    def de_registros(cls, df):
+        return cls(df, agregar_mensal(df), _nomes(df), verificar(df))
+
+    def avancar(self, df):
+        """Novo estado após uma sincronização (a tabela só é refeita se algo mudou)."""
+        # Gravação só anexa linhas ou manda para a lixeira: mesmo total e mesma lixeira = mesmos lançamentos ativos
+        if len(df) == len(self.registros) and _na_lixeira(df) == _na_lixeira(self.registros):
+            return self._replace(registros=df)
+        return RelatorioFrota.de_registros(df)
+
+    def anos(self):
+        return sorted(self.mensal.index.get_level_values('Mes').year.unique().tolist(), reverse=True)
+
+
+def filtrar(mensal, ano=None, mes=None):
+    """Linhas da tabela (CPF, mês) no filtro de ano e/ou mês (None = todos)."""
+    meses = mensal.index.get_level_values('Mes')
+    filtro = np.ones(len(mensal), dtype=bool)
+    if ano is not None: filtro &= meses.year == ano
+    if mes is not None: filtro &= meses.month == mes
+    return mensal[filtro]
+
+
+def ranking(mensal, nomes):
+    """Uma linha por motorista no recorte: receita por app, lucro, R$/km, dias ativos e a posição pelo lucro."""
+    por_cpf = mensal.groupby(level='CPF', sort=False).sum()
+    receita = por_cpf[COLS_RECEITA].sum(axis=1)
+    custos = por_cpf[COLS_CUSTO].sum(axis=1)
+    lucro = receita - custos
+    dias = por_cpf['Dias'].to_numpy()
+    tabela = pd.DataFrame({
+        'Motorista': nomes.reindex(por_cpf.index).fillna("").to_numpy(),
+        'Receita': receita, 'Custos': custos, 'Lucro': lucro, 'Km': por_cpf['Km'],
+        'Fat_KM': por_km(receita, por_cpf['Km']), 'Lucro_KM': por_km(lucro, por_cpf['Km']),
+        'Dias': por_cpf['Dias'].astype(int), 'Lucro_Dia': np.divide(lucro.to_numpy(), dias, out=np.zeros(len(dias)), where=dias > 0),
+        'Lancamentos': por_cpf['Lancamentos'].astype(int),
+    }, index=por_cpf.index)
+    tabela = tabela.join(por_cpf[COLS_RECEITA])
+    tabela.insert(0, 'Posicao', tabela['Lucro'].rank(ascending=False, method='min').astype(int))
+    return tabela.sort_values(['Posicao', 'Motorista'])
+
+
+def por_app(mensal):
+    """Frota inteira por app: faturamento, fatia do total e quantos motoristas rodaram nele."""
+    if mensal.empty: return pd.DataFrame(columns=['App', 'Valor', 'Participacao', 'Motoristas', 'Media_Motorista'])
+    por_cpf = mensal.groupby(level='CPF', sort=False)[COLS_RECEITA].sum()
+    valores = por_cpf.sum().to_numpy()
+    motoristas = (por_cpf > 0).sum().to_numpy()
+    total = valores.sum()
+    apps = pd.DataFrame({
+        'App': COLS_RECEITA, 'Valor': valores,
+        'Participacao': valores / total if total > 0 else np.zeros_like(valores),
+        'Motoristas': motoristas,
+        'Media_Motorista': np.divide(valores, motoristas, out=np.zeros_like(valores), where=motoristas > 0),
+    })
+    return apps[apps['Valor'] > 0].reset_index(drop=True)
+
+
+def evolucao(mensal):
+    """Totais da frota mês a mês: receita, lucro, km e motoristas ativos."""
+    por_mes = mensal.groupby(level='Mes').sum()
+    receita = por_mes[COLS_RECEITA].sum(axis=1)
+    lucro = receita - por_mes[COLS_CUSTO].sum(axis=1)
+    return pd.DataFrame({
+        'Receita': receita, 'Lucro': lucro, 'Km': por_mes['Km'], 'Fat_KM': por_km(receita, por_mes['Km']),
+        'Motoristas': mensal.groupby(level='Mes').size(),
+    })
+
+
+def exportar_xlsx(abas):
+    """{nome da aba: DataFrame} -> bytes de um .xlsx (openpyxl)."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as livro:
+        for nome, tabela in abas.items(): tabela.to_excel(livro, sheet_name=nome[:31])
+    return buffer.getvalue()
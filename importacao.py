@@ -0,0 +1,205 @@
+"""Importação em lote de extratos antigos (CSV/XLSX) para o esquema oficial.
+
+O arquivo é lido em blocos (``read_csv(chunksize=...)`` e openpyxl em modo
+read_only), cada bloco tem as colunas mapeadas para ``COLUNAS_OFICIAIS`` e é
+deduplicado por (CPF, Data, valores) contra o que já existe e contra os
+blocos anteriores. Só as linhas novas ficam em memória; quem chama as grava
+(o app, pela fila de escrita).
+"""
+import itertools
+import re
+import unicodedata
+from typing import NamedTuple
+
+import pandas as pd
+
+from esquema import COLUNAS_OFICIAIS, COLS_KM, COLS_NUM, gerar_id, limpar_cpf_serie
+from instrumentacao import span
+
+LINHAS_POR_BLOCO = 5000
+
+
+def _chave_coluna(nome):
+    s = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode().lower()
+    return re.sub(r'[^a-z0-9]+', '_', s).strip('_')
+
+
+# Cabeçalhos aceitos (sem acento, minúsculos, '_' no lugar de espaços) -> coluna oficial
+APELIDOS = {_chave_coluna(c): c for c in COLUNAS_OFICIAIS} | {
+    'dia': 'Data', 'date': 'Data', 'data_do_lancamento': 'Data',
+    'motorista': 'Usuario', 'nome': 'Usuario',
+    'urbano_99_uber': 'Urbano', 'uber': 'Urbano', '99': 'Urbano',
+    'bora_ali': 'Boraali', '163': 'app163',
+    'outros_ganhos': 'Outros_Receita', 'outras_receitas': 'Outros_Receita',
+    'combustivel': 'Energia', 'combustivel_energia': 'Energia',
+    'manutencao': 'Manuten', 'mensalidades_apps': 'Aplicativo',
+    'documentos_multas': 'Outros_Custos', 'km_ini': 'KM_Inicial', 'km_fim': 'KM_Final',
+    'observacao': 'Detalhes', 'obs': 'Detalhes',
+}
+
+
+class ResultadoImportacao(NamedTuple):
+    lidas: int
+    novas: int
+    duplicadas: int
+    invalidas: int
+    outro_cpf: int
+
+
+# --- Leitura em blocos ---
+def _tamanho(arquivo):
+    posicao = arquivo.tell()
+    arquivo.seek(0, 2)
+    tamanho = arquivo.tell()
+    arquivo.seek(posicao)
+    return tamanho
+
+
+def _blocos_csv(arquivo, linhas_por_bloco):
+    amostra = arquivo.read(64 * 1024)
+    arquivo.seek(0)
+    try: texto, codificacao = amostra.decode('utf-8-sig'), 'utf-8-sig'
+    except UnicodeDecodeError: texto, codificacao = amostra.decode('latin-1'), 'latin-1'
+    primeira = texto.splitlines()[0] if texto else ""
+    # Planilhas em português exportam com ';' e vírgula decimal
+    sep = ';' if primeira.count(';') > primeira.count(',') else ','
+    decimal = ',' if sep == ';' else '.'
+    total = _tamanho(arquivo) or 1
+    # Colunas de valor são convertidas pelo próprio leitor (em C); o resto fica texto (CPF com zeros à esquerda)
+    colunas = pd.read_csv(arquivo, sep=sep, nrows=0, encoding=codificacao).columns
+    arquivo.seek(0)
+    texto_cols = {c: str for c in colunas if APELIDOS.get(_chave_coluna(c)) not in COLS_NUM}
+    leitor = pd.read_csv(arquivo, sep=sep, dtype=texto_cols, decimal=decimal, thousands='.' if decimal == ',' else None,
+                         encoding=codificacao, chunksize=linhas_por_bloco)
+    with leitor:
+        for bloco in leitor:
+            yield bloco, decimal, min(arquivo.tell() / total, 1.0)
+
+
+def _blocos_xlsx(arquivo, linhas_por_bloco):
+    from openpyxl import load_workbook
+    livro = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        aba = livro.worksheets[0]
+        linhas = aba.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None: return
+        colunas = [c if c is not None else f"coluna_{i}" for i, c in enumerate(cabecalho)]
+        total = max((aba.max_row or 0) - 1, 1)
+        lidas = 0
+        while True:
+            bloco = list(itertools.islice(linhas, linhas_por_bloco))
+            if not bloco: break
+            lidas += len(bloco)
+            yield pd.DataFrame(bloco, columns=colunas), None, min(lidas / total, 1.0)
+    finally:
+        livro.close()
+
+
+def ler_blocos(arquivo, nome, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Gera (bloco cru, separador decimal ou None, fração lida) de um arquivo binário aberto (ou UploadedFile)."""
+    if nome.lower().endswith(('.xlsx', '.xlsm')): return _blocos_xlsx(arquivo, linhas_por_bloco)
+    return _blocos_csv(arquivo, linhas_por_bloco)
+
+
+# --- Conversão para o esquema ---
+# Célula de texto sem convenção conhecida (CSV com ',' ou texto no XLSX): decide pela própria célula
+_NUMERO_BR = r'-?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?'    # "150,50", "1.234,56", "1.234.567"
+_NUMERO_US = r'-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?'    # "150.50", "1,234.56", "1,234,567"
+_NUMERO_AMBIGUO = r'-?\d{1,3}[.,]\d{3}'                   # "1.234" / "1,234": milhar ou decimal?
+
+
+def _numero(s, decimal):
+    """Coluna de valores -> float64; vazio/texto vira 0.0 e célula ambígua vira NaN (linha inválida)."""
+    if pd.api.types.is_numeric_dtype(s): return s.astype('float64').fillna(0.0)
+    t = s.astype('string').str.replace(r'[R$\s]', '', regex=True)
+    if decimal == ',': t, ambigua = t.str.replace('.', '', regex=False).str.replace(',', '.', regex=False), False
+    else:
+        # CSV com ',' (a exportação pt-BR do Google Sheets põe "150,50" entre aspas) e texto no XLSX
+        ambigua = t.str.fullmatch(_NUMERO_AMBIGUO).fillna(False)
+        br = t.str.fullmatch(_NUMERO_BR).fillna(False) & ~ambigua
+        us = t.str.fullmatch(_NUMERO_US).fillna(False) & ~ambigua & ~br
+        t = t.where(~br, t.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+        t = t.where(~us, t.str.replace(',', '', regex=False))
+    return pd.to_numeric(t, errors='coerce').fillna(0.0).mask(ambigua).astype('float64')
+
+
+def _datas(s):
+    if pd.api.types.is_datetime64_any_dtype(s): return s.dt.normalize()
+    t = s.astype('string').str.strip()
+    iso = t.str.match(r'\d{4}-\d{2}-\d{2}').fillna(False)
+    datas = pd.to_datetime(t.where(iso), format='%Y-%m-%d', exact=False, errors='coerce')
+    br = pd.to_datetime(t.where(~iso), format='%d/%m/%Y', exact=False, errors='coerce')
+    return datas.fillna(br).dt.normalize()
+
+
+def preparar_bloco(bloco, cpf=None, usuario=None, decimal=None):
+    """Bloco cru -> (linhas válidas no esquema oficial, inválidas, de outro CPF). Sem ``ID_Unico`` ainda."""
+    bloco = bloco.rename(columns=lambda c: APELIDOS.get(_chave_coluna(c), c))
+    bloco = bloco.loc[:, ~bloco.columns.duplicated()]
+    vazio = pd.Series("", index=bloco.index, dtype=object)
+
+    df = pd.DataFrame(index=bloco.index)
+    if 'CPF' in bloco:
+        # "123.456.789-01" vira só dígitos antes da limpeza padrão
+        cpfs = bloco['CPF'].astype('string').str.replace(r'^(\d{3})\.(\d{3})\.(\d{3})-(\d{2})$', r'\1\2\3\4', regex=True)
+        df['CPF'] = limpar_cpf_serie(cpfs)
+        if cpf: df['CPF'] = df['CPF'].mask(df['CPF'] == "", cpf)
+    elif cpf: df['CPF'] = cpf
+    else: raise ValueError("O arquivo não tem coluna CPF.")
+    df['Data'] = _datas(bloco['Data']) if 'Data' in bloco else pd.Series(pd.NaT, index=bloco.index, dtype='datetime64[ns]')
+    for c in COLS_NUM: df[c] = _numero(bloco[c], decimal) if c in bloco else 0.0
+    ambigua = df[COLS_NUM].isna().any(axis=1)
+    df[COLS_NUM] = df[COLS_NUM].fillna(0.0)
+    usuarios = bloco['Usuario'].astype('string').fillna("").astype(object) if 'Usuario' in bloco else vazio
+    df['Usuario'] = usuarios.mask(usuarios == "", usuario or "")
+    df['Detalhes'] = bloco['Detalhes'].astype('string').fillna("").astype(object) if 'Detalhes' in bloco else vazio
+    df['Status'] = 'Ativo'
+    df['ID_Unico'] = ""
+
+    excluida = bloco['Status'].astype('string').str.strip().eq('Lixeira').fillna(False) if 'Status' in bloco else False
+    valida = df['Data'].notna() & (df['CPF'].str.len() == 11) & df[COLS_NUM].ne(0).any(axis=1) & ~ambigua & ~excluida
+    outro = valida & (df['CPF'] != cpf) if cpf else pd.Series(False, index=df.index)
+    df = df[valida & ~outro]
+    return df[COLUNAS_OFICIAIS], int((~valida).sum()), int(outro.sum())
+
+
+def chaves(df):
+    """Hash de (CPF, Data, valores) por linha: o mesmo dia lançado de novo tem a mesma chave."""
+    base = pd.DataFrame({'CPF': df['CPF'].astype(str).to_numpy(), 'Data': df['Data'].dt.strftime('%Y-%m-%d').to_numpy()})
+    # Mesma precisão do frame em memória (centavos, km inteiro); + 0.0 iguala -0.0 e 0.0
+    for c in COLS_NUM: base[c] = df[c].to_numpy(dtype='float64').round(0 if c in COLS_KM else 2) + 0.0
+    return pd.util.hash_pandas_object(base, index=False).to_numpy()
+
+
+def importar(arquivo, nome, existentes, cpf=None, usuario=None, progresso=None, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Lê e prepara o arquivo; devolve (registros novos, ResultadoImportacao). Não grava nada.
+
+    ``existentes``: lançamentos já gravados (normalizados; inclusive os da
+    lixeira, para reimportar o mesmo arquivo não ressuscitar exclusões).
+    Com ``cpf``, linhas sem CPF são desse motorista e as de outro CPF são
+    descartadas. ``progresso(fracao, linhas_lidas)`` é chamado a cada bloco.
+    """
+    vistas = set(chaves(existentes).tolist()) if not existentes.empty else set()
+    novas, lidas, duplicadas, invalidas, outro_cpf = [], 0, 0, 0, 0
+    with span("importar.ler"):
+        for bloco, decimal, fracao in ler_blocos(arquivo, nome, linhas_por_bloco):
+            lidas += len(bloco)
+            df, n_invalidas, n_outro = preparar_bloco(bloco, cpf, usuario, decimal)
+            invalidas += n_invalidas
+            outro_cpf += n_outro
+            if not df.empty:
+                # Repetidas no próprio arquivo também contam como duplicadas
+                nova = []
+                for chave in chaves(df).tolist():
+                    nova.append(chave not in vistas)
+                    vistas.add(chave)
+                duplicadas += nova.count(False)
+                novas.append(df[nova])
+            if progresso: progresso(fracao, lidas)
+
+    if not novas: return [], ResultadoImportacao(lidas, 0, duplicadas, invalidas, outro_cpf)
+    df = pd.concat(novas, ignore_index=True)
+    df['ID_Unico'] = [gerar_id() for _ in range(len(df))]
+    df['Data'] = df['Data'].dt.strftime('%Y-%m-%d')
+    return df.to_dict('records'), ResultadoImportacao(lidas, len(df), duplicadas, invalidas, outro_cpf)
@@ -0,0 +1,207 @@
+"""Medição por rerun: spans de tempo e contadores de I/O remoto e de cache.
+
+O Streamlit roda o script inteiro a cada clique. Cada execução vira um
+``Rerun`` (sessão, número, aba) com a duração de cada etapa marcada por
+``span`` e os contadores somados por ``contar``. O rerun corrente fica na
+thread do script, então ``span``/``contar`` podem ser chamados de qualquer
+módulo e não fazem nada fora de um rerun (benchmarks, threads de fundo).
+
+Os reruns fechados ficam num buffer do processo (painel de admin) e, com
+``BYD_PERF_LOG=arquivo.jsonl``, são anexados ao arquivo, um por linha.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+_local = threading.local()
+
+
+class Rerun:
+    def __init__(self, sessao, numero, rotulo=""):
+        self.sessao = sessao
+        self.numero = numero
+        self.rotulo = rotulo
+        self.inicio_epoca = time.time()
+        self.inicio = time.perf_counter()
+        self.ultimo = self.inicio
+        self.spans = []
+        self.contadores = Counter()
+
+    def para_dict(self, fim=None):
+        fim = self.ultimo if fim is None else fim
+        return {
+            "sessao": self.sessao, "rerun": self.numero, "rotulo": self.rotulo,
+            "inicio": round(self.inicio_epoca, 3), "total_ms": round((fim - self.inicio) * 1000, 3),
+            "spans": self.spans, "contadores": dict(self.contadores),
+        }
+
+
+class Coletor:
+    def __init__(self, capacidade=2000, caminho_log=None):
+        self.reruns = deque(maxlen=capacidade)
+        self.caminho_log = caminho_log
+        self._trava = threading.Lock()
+
+    def registrar(self, registro):
+        with self._trava:
+            self.reruns.append(registro)
+            if self.caminho_log:
+                with open(self.caminho_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def jsonl(self):
+        with self._trava:
+            return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.reruns)
+
+    def spans_df(self):
+        with self._trava:
+            linhas = [(r["sessao"], r["rerun"], s["nome"], s["ms"]) for r in self.reruns for s in r["spans"]]
+        return pd.DataFrame(linhas, columns=["sessao", "rerun", "nome", "ms"])
+
+    def reruns_df(self):
+        with self._trava:
+            linhas = [{k: r[k] for k in ("sessao", "rerun", "rotulo", "inicio", "total_ms")} | r["contadores"] for r in self.reruns]
+        return pd.DataFrame(linhas)
+
+    def percentis(self):
+        """p50/p90/p99 (ms) e volume de cada etapa entre os reruns guardados."""
+        df = self.spans_df()
+        if df.empty: return df
+        g = df.groupby("nome")["ms"]
+        return pd.DataFrame({
+            "chamadas": g.size(), "p50": g.quantile(0.5), "p90": g.quantile(0.9),
+            "p99": g.quantile(0.99), "max": g.max(), "total": g.sum(),
+        }).sort_values("total", ascending=False).round(2)
+
+
+COLETOR = Coletor(caminho_log=os.environ.get("BYD_PERF_LOG"))
+
+
+def iniciar_rerun(estado, sessao, rotulo=""):
+    """Abre o rerun desta execução do script. ``estado`` é o session_state da sessão.
+
+    Um rerun que não chegou a ``finalizar_rerun`` (st.rerun/st.stop no meio)
+    é fechado aqui, com a duração até a última etapa medida.
+    """
+    anterior = estado.get("_perf_rerun")
+    if anterior is not None: COLETOR.registrar(anterior.para_dict())
+    numero = estado.get("_perf_numero", 0) + 1
+    estado["_perf_numero"] = numero
+    rerun = Rerun(sessao, numero, rotulo)
+    estado["_perf_rerun"] = rerun
+    _local.rerun = rerun
+    return rerun
+
+
+def finalizar_rerun(estado):
+    rerun = estado.get("_perf_rerun")
+    if rerun is None: return
+    estado["_perf_rerun"] = None
+    _local.rerun = None
+    COLETOR.registrar(rerun.para_dict(time.perf_counter()))
+
+
+def rerun_atual():
+    return getattr(_local, "rerun", None)
+
+
+def rotular(rotulo):
+    """Nome da aba/fluxo do rerun corrente (ex.: '📊 DASHBOARD'), para filtrar no painel."""
+    rerun = rerun_atual()
+    if rerun is not None: rerun.rotulo = rotulo
+
+
+@contextmanager
+def span(nome):
+    rerun = rerun_atual()
+    if rerun is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        fim = time.perf_counter()
+        rerun.spans.append({"nome": nome, "ms": round((fim - t0) * 1000, 3)})
+        rerun.ultimo = fim
+
+
+def contar(nome, n=1):
+    rerun = rerun_atual()
+    if rerun is not None: rerun.contadores[nome] += n
+
+
+def _tamanho(valor):
+    # Estimativa do payload: soma do texto das células (listas do gspread) ou memória do DataFrame
+    if valor is None: return 0
+    if isinstance(valor, pd.DataFrame): return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, dict): return sum(_tamanho(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)): return sum(_tamanho(v) for v in valor)
+    return len(str(valor))
+
+
+class _AbaInstrumentada:
+    def __init__(self, aba):
+        self._aba = aba
+
+    def __getattr__(self, nome):
+        metodo = getattr(self._aba, nome)
+        if not callable(metodo): return metodo
+
+        def chamar(*args, **kwargs):
+            with span(f"remoto.{nome}"):
+                resultado = metodo(*args, **kwargs)
+            contar("remoto.chamadas")
+            contar(f"remoto.{nome}")
+            if nome in ("append_rows", "update_cell", "batch_update"): contar("remoto.bytes_enviados", _tamanho(args) + _tamanho(list(kwargs.values())))
+            else: contar("remoto.bytes_recebidos", _tamanho(resultado))
+            return resultado
+        return chamar
+
+
+class _ClienteInstrumentado:
+    def __init__(self, cliente):
+        self._cliente = cliente
+
+    def _select_worksheet(self, *args, **kwargs):
+        # O cliente gsheets faz duas chamadas aqui: open_by_url e os metadados da aba (get_worksheet)
+        with span("remoto.abrir_aba"):
+            aba = self._cliente._select_worksheet(*args, **kwargs)
+        contar("remoto.chamadas", 2)
+        contar("remoto.abrir_aba")
+        return _AbaInstrumentada(aba)
+
+    def __getattr__(self, nome):
+        return getattr(self._cliente, nome)
+
+
+class ConexaoInstrumentada:
+    """Proxy da conexão (GSheetsConnection ou ConexaoLocal) que mede e conta cada chamada remota."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.client = _ClienteInstrumentado(conn.client)
+
+    def read(self, *args, **kwargs):
+        with span("remoto.read"):
+            df = self._conn.read(*args, **kwargs)
+        contar("remoto.chamadas")
+        contar("remoto.read")
+        contar("remoto.bytes_recebidos", _tamanho(df))
+        return df
+
+    def update(self, *args, data=None, **kwargs):
+        with span("remoto.update"):
+            resultado = self._conn.update(*args, data=data, **kwargs)
+        contar("remoto.chamadas")
+        contar("remoto.update")
+        contar("remoto.bytes_enviados", _tamanho(data))
+        return resultado
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
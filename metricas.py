@@ -0,0 +1,100 @@
+"""Cálculos financeiros do dashboard, vetorizados e sem dependência do Streamlit.
+
+O frame de trabalho é indexado por um DatetimeIndex ordenado
+(``indexar_por_data``); os filtros de período viram fatias por busca binária
+no índice em vez de máscaras ``.dt.year``/``.dt.month`` sobre todas as linhas.
+Lançamentos sem data válida ficam de fora, como nos agregados de ``rollups``.
+"""
+import numpy as np
+import pandas as pd
+
+from esquema import COLS_RECEITA, COLS_CUSTO
+
+
+def indexar_por_data(df):
+    """Lançamentos com data válida, em ordem cronológica, com ``Data`` também como índice."""
+    df = df[df['Data'].notna()].sort_values('Data', kind='stable')
+    return df.set_index(pd.DatetimeIndex(df['Data'], name=None))
+
+
+def _fatia(df, inicio, fim):
+    i, j = df.index.searchsorted([inicio, fim])
+    return df.iloc[i:j]
+
+
+def filtrar_periodo(df, dia=None, ano=None, mes=None):
+    """Recorte de um frame de ``indexar_por_data``: um dia, ou ano e/ou mês (None = todos)."""
+    if df.empty: return df
+    if dia is not None:
+        inicio = pd.Timestamp(dia)
+        return _fatia(df, inicio, inicio + pd.Timedelta(days=1))
+    if ano is not None and mes is not None:
+        inicio = pd.Timestamp(ano, mes, 1)
+        return _fatia(df, inicio, inicio + pd.DateOffset(months=1))
+    if ano is not None:
+        return _fatia(df, pd.Timestamp(ano, 1, 1), pd.Timestamp(ano + 1, 1, 1))
+    if mes is not None:
+        # Mesmo mês em todos os anos: uma fatia por ano, juntas num único iloc
+        anos = range(df.index[0].year, df.index[-1].year + 1)
+        limites = [df.index.searchsorted([pd.Timestamp(a, mes, 1), pd.Timestamp(a, mes, 1) + pd.DateOffset(months=1)]) for a in anos]
+        return df.iloc[np.concatenate([np.arange(i, j) for i, j in limites])]
+    return df
+
+
+def colunas_calculadas(df):
+    """Acrescenta Receita, Custos, Lucro e Km rodados por lançamento."""
+    receita = df[COLS_RECEITA].to_numpy(dtype='float64').sum(axis=1)
+    custos = df[COLS_CUSTO].to_numpy(dtype='float64').sum(axis=1)
+    km = np.clip(df['KM_Final'].to_numpy(dtype='float64') - df['KM_Inicial'].to_numpy(dtype='float64'), 0, None)
+    return df.assign(**{'Receita': receita, 'Custos': custos, 'Lucro': receita - custos, 'Km rodados': km})
+
+
+def por_km(valor, km):
+    """``valor / km`` onde houve km rodado, 0 no resto (sem dividir por zero)."""
+    valor = np.asarray(valor, dtype='float64')
+    km = np.asarray(km, dtype='float64')
+    return np.divide(valor, km, out=np.zeros(np.broadcast(valor, km).shape), where=km > 0)
+
+
+def totais(df, km='Km'):
+    """Receita, custos, lucro e km somados de um recorte: agregados do ``rollups`` ou lançamentos (``km='Km rodados'``)."""
+    if df.empty: return 0.0, 0.0, 0.0, 0.0
+    receita = float(df[COLS_RECEITA].to_numpy(dtype='float64').sum())
+    custos = float(df[COLS_CUSTO].to_numpy(dtype='float64').sum())
+    return receita, custos, receita - custos, float(df[km].to_numpy(dtype='float64').sum())
+
+
+def participacao_apps(df):
+    """Faturamento por app e a fração de cada um no total (apps sem receita ficam de fora)."""
+    valores = df[COLS_RECEITA].to_numpy(dtype='float64').sum(axis=0)
+    total = valores.sum()
+    apps = pd.DataFrame({'App': COLS_RECEITA, 'Valor': valores,
+                         'Participacao': valores / total if total > 0 else np.zeros_like(valores)})
+    return apps[apps['Valor'] > 0].reset_index(drop=True)
+
+
+# Granularidade dos gráficos: a menor em que o período cabe em ``max_barras``
+GRANULARIDADES = [('D', 'dia', '%d/%m', 1), ('W', 'semana', '%d/%m', 7), ('M', 'mês', '%m/%Y', 31)]
+
+
+def agrupar_no_tempo(diario, max_barras=62):
+    """Agregado diário (``rollups``) -> (uma linha por dia, semana ou mês, nome da granularidade).
+
+    Soma receita, custos e km no balde antes de calcular Lucro, Fat_KM e
+    Lucro_KM, então o gráfico nunca tem mais barras que o necessário.
+    """
+    colunas = ['Periodo', 'Receita', 'Custos', 'Lucro', 'Km', 'Fat_KM', 'Lucro_KM']
+    if diario.empty: return pd.DataFrame(columns=colunas), 'dia'
+    dias = (diario.index[-1] - diario.index[0]).days + 1
+    freq, nome, rotulo, _ = next((g for g in GRANULARIDADES if dias <= max_barras * g[3]), GRANULARIDADES[-1])
+    base = pd.DataFrame({
+        'Receita': diario[COLS_RECEITA].to_numpy(dtype='float64').sum(axis=1),
+        'Custos': diario[COLS_CUSTO].to_numpy(dtype='float64').sum(axis=1),
+        'Km': diario['Km'].to_numpy(dtype='float64'),
+    }, index=diario.index)
+    if freq != 'D': base = base.groupby(diario.index.to_period(freq).start_time).sum()
+    receita, custos, km = (base[c].to_numpy() for c in ('Receita', 'Custos', 'Km'))
+    return pd.DataFrame({
+        'Periodo': base.index.strftime(rotulo), 'Receita': receita, 'Custos': custos, 'Lucro': receita - custos,
+        'Km': km, 'Fat_KM': por_km(receita, km), 'Lucro_KM': por_km(receita - custos, km),
+    }), nome
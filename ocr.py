@@ -0,0 +1,143 @@
+"""Leitura dos prints de ganhos diários (Uber/99, BoraAli, 163) por OCR.
+
+Cada imagem vai para um pool de processos (o tesseract e o pré-processamento
+do Pillow não disputam o GIL do script do Streamlit) e o resultado fica num
+cache pelo hash do conteúdo: reenviar o mesmo print ou recarregar a página não
+repete o OCR. ``enviar`` só agenda e retorna; ``resultados`` diz o que já
+terminou, para a tela acompanhar sem bloquear.
+
+Precisa do binário ``tesseract`` (packages.txt) e do ``pytesseract``; sem
+eles ``disponivel()`` é falso e a tela não oferece o envio.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Palavra no print -> campo do formulário
+APPS = [(re.compile(r'bora\s*ali', re.I), 'Boraali'), (re.compile(r'\b163\b'), 'app163'),
+        (re.compile(r'\buber\b|\b99\b|99\s*pop|99\s*motorista', re.I), 'Urbano')]
+_VALOR = re.compile(r'R\s*\$\s*(\d{1,3}(?:\.\d{3})*,\d{2}|\d+,\d{2})')
+# Valores e distâncias saem antes de procurar o app ("R$ 163,50" e "163 km" não são o app 163)
+_NUMEROS = re.compile(r'R\s*\$\s*[\d.,]+|\d[\d.,]*\s*km\b', re.I)
+# Linhas de total em ordem de preferência: o ganho do dia antes de "hoje" e do saldo da conta
+_TOTAL = [re.compile(r'ganho|total|faturamento|recebid', re.I), re.compile(r'hoje', re.I), re.compile(r'saldo', re.I)]
+
+
+def disponivel():
+    try: import pytesseract  # noqa: F401
+    except ImportError: return False
+    return shutil.which("tesseract") is not None
+
+
+def hash_imagem(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def interpretar_texto(texto):
+    """Texto do OCR -> {'app', 'valor'}: o app pelo nome e o valor da linha de total (ou o maior R$)."""
+    sem_numeros = _NUMEROS.sub(" ", texto)
+    app = next((campo for padrao, campo in APPS if padrao.search(sem_numeros)), None)
+    valores = []
+    for linha in texto.splitlines():
+        prioridade = next((i for i, padrao in enumerate(_TOTAL) if padrao.search(linha)), len(_TOTAL))
+        for v in _VALOR.findall(linha):
+            valores.append((prioridade, float(v.replace('.', '').replace(',', '.'))))
+    if not valores: return {'app': app, 'valor': None}
+    melhor = min(p for p, _ in valores)
+    de_total = [v for p, v in valores if p == melhor]
+    return {'app': app, 'valor': de_total[0] if melhor < len(_TOTAL) else max(de_total)}
+
+
+def ler_imagem(conteudo):
+    """Roda no processo do pool: pré-processa, faz OCR e interpreta."""
+    import io
+
+    import pytesseract
+    from PIL import Image, ImageOps
+
+    imagem = ImageOps.grayscale(Image.open(io.BytesIO(conteudo)))
+    # Prints de celular têm fonte pequena: ampliar e aumentar o contraste ajuda o tesseract
+    if imagem.width < 1500: imagem = imagem.resize((imagem.width * 2, imagem.height * 2))
+    texto = pytesseract.image_to_string(ImageOps.autocontrast(imagem))
+    return interpretar_texto(texto) | {'texto': texto}
+
+
+class LeitorPrints:
+    def __init__(self, processos=None, max_cache=512, ler=ler_imagem, espera_erro=10.0):
+        """``espera_erro``: segundos até um print que falhou poder ser lido de novo (sem repetir a cada rerun)."""
+        self.processos = processos or min(4, os.cpu_count() or 1)
+        self.max_cache = max_cache
+        self.espera_erro = espera_erro
+        self._ler = ler
+        self._pool = None
+        self._cache = OrderedDict()  # hash -> Future ou resultado
+        self._erros = {}  # hash -> (instante, resultado com 'erro'): fora do cache, repetido no próximo envio
+        self._trava = threading.Lock()
+        self.ocr_feitos = 0
+        self.acertos = 0
+
+    def _executor(self):
+        # spawn: o processo do Streamlit tem threads, fork herdaria travas delas
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.processos, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def enviar(self, conteudos):
+        """Agenda o OCR das imagens que ainda não estão no cache; devolve os hashes na mesma ordem."""
+        hashes = []
+        with self._trava:
+            for conteudo in conteudos:
+                h = hash_imagem(conteudo)
+                hashes.append(h)
+                if h in self._cache:
+                    self._cache.move_to_end(h)
+                    self.acertos += 1
+                    continue
+                erro = self._erros.get(h)
+                if erro is not None and time.monotonic() - erro[0] < self.espera_erro: continue
+                self._erros.pop(h, None)
+                self._cache[h] = self._executor().submit(self._ler, conteudo)
+                self.ocr_feitos += 1
+                while len(self._cache) > self.max_cache: self._cache.popitem(last=False)
+        return hashes
+
+    def resultados(self, hashes):
+        """{hash: resultado} dos que terminaram (erro vira {'erro': ...}); os pendentes ficam de fora."""
+        prontos = {}
+        with self._trava:
+            for h in hashes:
+                item = self._cache.get(h)
+                if item is None:
+                    if h in self._erros: prontos[h] = self._erros[h][1]
+                    continue
+                if hasattr(item, "done"):
+                    if not item.done(): continue
+                    erro = item.exception()
+                    if erro:
+                        # Processo do pool morreu: o próximo envio cria outro pool
+                        if isinstance(erro, BrokenProcessPool): self._pool = None
+                        # Erro não entra no cache: o print é lido de novo quando for reenviado
+                        del self._cache[h]
+                        self._erros[h] = (time.monotonic(), {'app': None, 'valor': None, 'erro': str(erro)})
+                        while len(self._erros) > self.max_cache: self._erros.pop(next(iter(self._erros)))
+                        prontos[h] = self._erros[h][1]
+                        continue
+                    # Guarda só o resultado: a Future (e a imagem) podem ser liberadas
+                    item = self._cache[h] = item.result()
+                prontos[h] = item
+        return prontos
+
+
+def somar_por_app(resultados):
+    """Total por campo do formulário (dois prints do mesmo app no dia somam)."""
+    totais = {}
+    for r in resultados:
+        if r.get('app') and r.get('valor'): totais[r['app']] = round(totais.get(r['app'], 0.0) + r['valor'], 2)
+    return totais
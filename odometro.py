@@ -0,0 +1,123 @@
+"""Hodômetro: última leitura por motorista e conferência da continuidade.
+
+``Odometro`` é a última leitura (dia e KM_Final) de um motorista. Fica junto
+dos agregados em ``DadosMotorista`` e é mantida pela diferença a cada
+sincronização (lançamento salvo ou excluído), então o "KM Inicial" da aba
+LANÇAR sai pronto, sem ordenar o histórico.
+
+``verificar`` confere a planilha inteira (um ou todos os motoristas) numa
+única passada vetorizada: ordena por (CPF, Data, KM_Inicial) e compara cada
+leitura com a anterior do mesmo CPF.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from esquema import ativos
+
+# Km sem lançamento entre um dia e o seguinte tolerados antes de apontar lacuna
+FOLGA_KM = 5
+# Distância num único lançamento acima disso é sempre atípica
+KM_DIA_MAX = 1200
+# Atípica pelo histórico do motorista: mediana + N desvios (MAD), com pelo menos MIN_AMOSTRAS dias
+DESVIOS_ATIPICA = 6
+MIN_AMOSTRAS = 10
+
+PROBLEMAS = ['Regressão', 'Sobreposição', 'Distância atípica', 'Lacuna']
+
+
+class Odometro(NamedTuple):
+    data: Optional[pd.Timestamp]
+    km: int
+
+
+SEM_LEITURA = Odometro(None, 0)
+
+
+def ultima_leitura(df):
+    """Última leitura dos lançamentos ativos: o dia mais recente e, nele, o maior KM_Final."""
+    df = ativos(df)
+    com_km = df[(df['KM_Final'] > 0) & df['Data'].notna()]
+    if com_km.empty: return SEM_LEITURA
+    datas = com_km['Data'].to_numpy()
+    km = com_km['KM_Final'].to_numpy()
+    i = np.lexsort((km, datas))[-1]
+    return Odometro(pd.Timestamp(datas[i]), int(km[i]))
+
+
+def mais_recente(a, b):
+    if a.data is None: return b
+    if b.data is None: return a
+    return max(a, b)
+
+
+def avancar_leitura(atual, entrou, saiu, depois):
+    """Nova última leitura após a sincronização (``entrou``/``saiu``: lançamentos ativos que mudaram)."""
+    # Saiu justamente a última leitura: só então volta a procurar no histórico
+    if atual.data is not None and not saiu.empty and \
+            ((saiu['Data'] == atual.data) & (saiu['KM_Final'] == atual.km)).any():
+        return ultima_leitura(depois)
+    if entrou.empty: return atual
+    return mais_recente(atual, ultima_leitura(entrou))
+
+
+def verificar(df, folga_km=FOLGA_KM, km_dia_max=KM_DIA_MAX):
+    """Lançamentos ativos com o hodômetro inconsistente, um por linha com o ``Problema``.
+
+    - Regressão: KM_Final abaixo do KM_Inicial, ou o dia começa abaixo do início do anterior;
+    - Sobreposição: começa antes do KM_Final do lançamento anterior (km contado duas vezes);
+    - Distância atípica: acima de ``km_dia_max`` ou muito acima do normal do motorista;
+    - Lacuna: começa mais de ``folga_km`` depois do KM_Final anterior (km sem lançamento).
+
+    Lançamentos sem KM (0 e 0) ficam de fora; com só um dos dois, o outro é igual a ele.
+    """
+    df = ativos(df)
+    ini = df['KM_Inicial'].to_numpy(dtype='int64')
+    fim = df['KM_Final'].to_numpy(dtype='int64')
+    com_km = ((ini > 0) | (fim > 0)) & df['Data'].notna().to_numpy()
+    df, ini, fim = df[com_km], ini[com_km], fim[com_km]
+    ini, fim = np.where(ini > 0, ini, fim), np.where(fim > 0, fim, ini)
+    colunas = ['CPF', 'Usuario', 'Data', 'ID_Unico', 'KM_Inicial', 'KM_Final', 'Distancia', 'KM_Anterior', 'Diferenca', 'Problema']
+    if df.empty: return pd.DataFrame(columns=colunas)
+
+    codigos = pd.factorize(df['CPF'])[0]
+    ordem = np.lexsort((ini, df['Data'].to_numpy(), codigos))
+    codigos, ini, fim = codigos[ordem], ini[ordem], fim[ordem]
+    mesmo = np.r_[False, codigos[1:] == codigos[:-1]]
+    ant_ini, ant_fim = np.r_[0, ini[:-1]], np.r_[0, fim[:-1]]
+    distancia = fim - ini
+
+    regressao = (fim < ini) | (mesmo & (ini < ant_ini))
+    sobreposicao = mesmo & (ini < ant_fim)
+    lacuna = mesmo & (ini > ant_fim + folga_km)
+
+    # Normal do motorista pela mediana e MAD (robustos aos próprios erros) das distâncias positivas
+    rodou = pd.Series(np.where(distancia > 0, distancia, np.nan))
+    grupos = rodou.groupby(codigos)
+    mediana = grupos.transform('median').to_numpy()
+    mad = (rodou - mediana).abs().groupby(codigos).transform('median').to_numpy()
+    amostras = grupos.transform('count').to_numpy()
+    limite = np.maximum(mediana + DESVIOS_ATIPICA * 1.4826 * mad, 2 * mediana)
+    atipica = (distancia > km_dia_max) | ((amostras >= MIN_AMOSTRAS) & (distancia > limite))
+
+    problema = np.select([regressao, sobreposicao, atipica, lacuna], PROBLEMAS, default="")
+    marcado = problema != ""
+    linhas = df.iloc[ordem[marcado]]
+    return pd.DataFrame({
+        'CPF': linhas['CPF'].astype(str).to_numpy(), 'Usuario': linhas['Usuario'].astype(str).to_numpy(),
+        'Data': linhas['Data'].to_numpy(), 'ID_Unico': linhas['ID_Unico'].to_numpy(),
+        'KM_Inicial': ini[marcado], 'KM_Final': fim[marcado], 'Distancia': distancia[marcado],
+        'KM_Anterior': np.where(mesmo, ant_fim, 0)[marcado], 'Diferenca': np.where(mesmo, ini - ant_fim, 0)[marcado],
+        'Problema': pd.Categorical(problema[marcado], categories=PROBLEMAS),
+    }, columns=colunas)
+
+
+def resumo(problemas):
+    """Quantidade de lançamentos por motorista e tipo de problema (lote da frota)."""
+    if problemas.empty: return pd.DataFrame(columns=PROBLEMAS)
+    tabela = problemas.groupby(['CPF', 'Problema'], observed=False).size().unstack(fill_value=0)
+    nomes = problemas.drop_duplicates('CPF', keep='last').set_index('CPF')['Usuario']
+    tabela = tabela[tabela.sum(axis=1) > 0]
+    tabela.insert(0, 'Motorista', nomes.reindex(tabela.index))
+    return tabela.assign(Total=tabela[PROBLEMAS].sum(axis=1)).sort_values('Total', ascending=False)
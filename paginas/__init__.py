@@ -0,0 +1 @@
+"""Páginas do app, importadas só quando abertas (o dashboard traz o Plotly junto)."""
@@ -0,0 +1,100 @@
+"""Peças comuns às páginas: formatação, data de hoje e o CSS do app."""
+import re
+from datetime import datetime
+
+import pytz
+import streamlit as st
+
+FUSO_BR = pytz.timezone('America/Sao_Paulo')
+
+
+def hoje_br():
+    return datetime.now(FUSO_BR).date()
+
+
+def format_br(valor):
+    return f"R$ {valor:,.2f}".replace(",", "v").replace(".", ",").replace("v", ".")
+
+
+def format_int_br(valor):
+    return f"{int(valor):,}".replace(",", ".")
+
+
+def v(valor):
+    if valor is None: return 0.0
+    return float(valor)
+
+
+# --- DESIGN PREMIUM & COMPACTO ---
+_CSS = """
+<style>
+    /* --- LIMPEZA GERAL --- */
+    #MainMenu, header, footer, .stDeployButton {display: none !important;}
+    [data-testid="stToolbar"], [data-testid="stDecoration"] {display: none !important;}
+    
+    .block-container {
+        padding-top: 1rem !important; 
+        padding-bottom: 5rem !important;
+        padding-left: 0.5rem !important;
+        padding-right: 0.5rem !important;
+    }
+    
+    /* --- BOTÃO PRINCIPAL --- */
+    div.stButton > button[kind="primary"] {
+        background: linear-gradient(45deg, #28a745, #218838) !important;
+        color: white !important;
+        border-radius: 15px !important;
+        height: 4rem !important;
+        font-weight: 700 !important;
+        font-size: 1.2rem !important;
+        width: 100% !important;
+        border: none !important;
+        box-shadow: 0 4px 10px rgba(40, 167, 69, 0.3);
+        transition: all 0.3s ease;
+    }
+    div.stButton > button[kind="primary"]:active { transform: scale(0.98); }
+
+    /* --- ABAS DE NAVEGAÇÃO --- */
+    div[role="radiogroup"] {
+        display: flex; gap: 8px; background: transparent; border: none; justify-content: center; margin-bottom: 15px;
+    }
+    div[role="radiogroup"] label {
+        flex: 1; text-align: center; border-radius: 12px; padding: 12px 5px; font-size: 0.9rem; cursor: pointer;
+        border: 1px solid #e0e0e0; background-color: #ffffff; color: #666; font-weight: 600;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.03);
+    }
+    div[role="radiogroup"] label[data-checked="true"] {
+        background-color: #1e2a38 !important; color: white !important; border: 1px solid #1e2a38 !important;
+        font-weight: 800 !important; box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+    }
+
+    /* --- CARDS KPI --- */
+    [data-testid="stMetric"] {
+        background-color: #f8f9fa !important; border: 1px solid #eee !important; padding: 10px !important;
+        border-radius: 12px !important; text-align: center;
+    }
+    [data-testid="stMetricLabel"] { font-size: 0.75rem !important; color: #666; font-weight: 600; text-transform: uppercase; }
+    [data-testid="stMetricValue"] { font-size: 1.1rem !important; font-weight: 800; color: #111; }
+    
+    /* --- ESTILO DE LOGIN --- */
+    .login-header { text-align: center; padding: 2rem 0; animation: fadeIn 1s ease-in; }
+    .login-logo { font-size: 4rem; margin-bottom: 0.5rem; }
+    .login-title { font-size: 2rem; font-weight: 800; color: #1e2a38; margin: 0; }
+    .login-subtitle { font-size: 1rem; color: #888; font-weight: 400; margin-top: 5px; }
+    
+    /* --- AJUSTES TABELA (COMPACTA) --- */
+    .stDataFrame { width: 100% !important; }
+    [data-testid="stDataFrame"] td { white-space: nowrap !important; } 
+    
+    @keyframes fadeIn {
+        0% { opacity: 0; transform: translateY(20px); }
+        100% { opacity: 1; transform: translateY(0); }
+    }
+</style>
+"""
+# Compactado uma vez por processo; o Streamlit limpa a página a cada rerun, então o <style> vai em todo rerun
+CSS = re.sub(r"\s*([{};:,>])\s*", r"\1", re.sub(r"/\*.*?\*/|\s+", " ", _CSS)).strip()
+
+
+def estilo():
+    st.markdown(CSS, unsafe_allow_html=True)
@@ -0,0 +1,193 @@
+"""Aba DASHBOARD: KPIs do período, conferência do hodômetro, extrato e gráficos."""
+import pandas as pd
+import streamlit as st
+
+from instrumentacao import span
+from metricas import indexar_por_data, filtrar_periodo, colunas_calculadas, participacao_apps, agrupar_no_tempo
+from paginas.comum import format_br, format_int_br, hoje_br
+from recursos import dados_do_motorista, fila_escrita
+from rollups import totais_agregado
+
+
+def configurar_grafico(fig):
+    fig.update_layout(
+        xaxis=dict(fixedrange=True),
+        yaxis=dict(fixedrange=True),
+        margin=dict(l=10, r=10, t=30, b=10),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        font=dict(size=12),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+# Figuras por (CPF, filtro, versão dos dados): rolar o extrato ou trocar de aba não remonta nada
+@st.cache_data(max_entries=512, show_spinner=False)
+def figuras_dashboard(cpf, filtro, versao, _diario):
+    # Plotly (~1 s de import) só entra no processo quando alguém abre os gráficos
+    import plotly.express as px
+    figuras = {}
+    apps_sum = participacao_apps(_diario)
+    if not apps_sum.empty:
+        figuras['pizza'] = configurar_grafico(px.pie(apps_sum, values='Valor', names='App', hole=0.4, color_discrete_sequence=px.colors.qualitative.Pastel))
+    # Um balde por dia, semana ou mês, conforme o tamanho do período
+    serie, granularidade = agrupar_no_tempo(_diario)
+    if not serie.empty:
+        figuras['evolucao'] = configurar_grafico(px.bar(serie, x='Periodo', y=['Receita', 'Lucro'], barmode='group', text_auto='.2s',
+                                                        color_discrete_map={'Receita': '#28a745', 'Lucro': '#1e2a38'}))
+        figuras['eficiencia'] = configurar_grafico(px.bar(serie, x='Periodo', y=['Fat_KM', 'Lucro_KM'], barmode='group',
+                                                          color_discrete_map={'Fat_KM': '#17a2b8', 'Lucro_KM': '#6c757d'}))
+    return figuras, granularidade
+
+
+def renderizar():
+    cpf = st.session_state.cpf_usuario
+    with span("carregar_dados"):
+        dados, ids_pendentes, lixeira_pendente = dados_do_motorista(cpf)
+        df_cpf, rollup = dados.registros, dados.rollup
+        df_user = df_cpf[df_cpf['Status'] != 'Lixeira']
+    if df_user.empty:
+        st.info("Nenhum dado lançado ainda.")
+        return
+
+    # Índice por data (ordem cronológica) para filtrar por fatias
+    with span("dashboard.indice"):
+        df_bi = indexar_por_data(df_user)
+
+    # Filtro Inteligente (Ignora Futuro) - lido dos agregados diários
+    hoje = hoje_br()
+    ultima_data_valida = rollup.ultimo_dia(hoje)
+    if ultima_data_valida is not None:
+        ano_padrao = ultima_data_valida.year
+        mes_padrao = ultima_data_valida.month
+    else:
+        ano_padrao = hoje.year
+        mes_padrao = hoje.month
+
+    with st.expander("📅 Filtrar Período", expanded=False):
+        f_dia = st.date_input("Dia Específico", value=None, format="DD/MM/YYYY", key="filtro_dia")
+        fc1, fc2 = st.columns(2)
+
+        anos_disp = [str(a) for a in rollup.anos()]
+        if str(hoje.year) not in anos_disp: anos_disp.insert(0, str(hoje.year))
+
+        meses_map = {1:"Janeiro", 2:"Fevereiro", 3:"Março", 4:"Abril", 5:"Maio", 6:"Junho", 7:"Julho", 8:"Agosto", 9:"Setembro", 10:"Outubro", 11:"Novembro", 12:"Dezembro"}
+
+        try: idx_ano = anos_disp.index(str(ano_padrao))
+        except: idx_ano = 0
+        idx_mes = mes_padrao - 1
+
+        sel_ano = fc1.selectbox("Ano", ["Todos"] + anos_disp, index=idx_ano+1 if "Todos" in ["Todos"]+anos_disp else 0, key="filtro_ano")
+        sel_mes = fc2.selectbox("Mês", ["Todos"] + list(meses_map.values()), index=idx_mes+1, key="filtro_mes")
+
+    # Aplica Filtros
+    ano_f = None if sel_ano == "Todos" else int(sel_ano)
+    mes_f = None if sel_mes == "Todos" else list(meses_map.keys())[list(meses_map.values()).index(sel_mes)]
+    with span("dashboard.calculos"):
+        df_periodo = filtrar_periodo(df_bi, dia=f_dia, ano=ano_f, mes=mes_f)
+
+        # Cálculos por linha do extrato, em ordem Recente -> Antigo
+        df_f = colunas_calculadas(df_periodo).iloc[::-1]
+        # KPIs direto dos agregados por dia/mês
+        tr, tc, tl, tk = totais_agregado(rollup.periodo(dia=f_dia, ano=ano_f, mes=mes_f))
+
+    st.markdown("#### 💵 Performance Financeira")
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Faturamento", format_br(tr))
+    m2.metric("Lucro Líquido", format_br(tl))
+    m3.metric("Custos", format_br(tc))
+
+    m4, m5, m6 = st.columns(3)
+    m4.metric("KM Total", format_int_br(tk))
+    m5.metric("Fat/KM", format_br(tr/tk if tk > 0 else 0)) 
+    m6.metric("Lucro/KM", format_br(tl/tk if tk > 0 else 0))
+
+    # Hodômetro conferido no histórico inteiro (a continuidade atravessa o filtro), já no cache do motorista; mostra o que cai no período
+    with span("dashboard.hodometro"):
+        problemas_km = filtrar_periodo(indexar_por_data(dados.conferencia_km), dia=f_dia, ano=ano_f, mes=mes_f)
+    if not problemas_km.empty:
+        with st.expander(f"⚠️ Hodômetro: {len(problemas_km)} lançamento(s) a conferir", expanded=False):
+            km_suspeito = problemas_km['Distancia'].clip(lower=0).sum()
+            st.caption(f"{format_int_br(km_suspeito)} km desses lançamentos entram no KM Total, Fat/KM e Lucro/KM acima. "
+                       "Corrija excluindo e lançando de novo.")
+            st.dataframe(
+                problemas_km[['Data', 'Problema', 'KM_Inicial', 'KM_Final', 'Distancia', 'KM_Anterior', 'Diferenca']]
+                    .assign(Data=problemas_km['Data'].dt.strftime('%d/%m/%Y'), Problema=problemas_km['Problema'].astype(str)),
+                use_container_width=True, hide_index=True,
+                column_config={
+                    "KM_Inicial": st.column_config.NumberColumn("KM Ini", format="%d"),
+                    "KM_Final": st.column_config.NumberColumn("KM Fim", format="%d"),
+                    "Distancia": st.column_config.NumberColumn("Rodado", format="%d"),
+                    "KM_Anterior": st.column_config.NumberColumn("KM Fim anterior", format="%d"),
+                    "Diferenca": st.column_config.NumberColumn("Diferença", format="%d"),
+                })
+
+    st.divider()
+    st.markdown("#### 📋 Extrato Completo")
+    st.caption("↔️ Arraste para o lado para ver mais detalhes")
+
+    cols_ordered = [
+        'Sync', 'Data', 'Receita', 'Custos', 'Lucro', 
+        'Urbano', 'Boraali', 'app163', 'Outros_Receita', 
+        'Energia', 'Manuten', 'Seguro', 'Outros_Custos', 'Aplicativo', 'Alimentacao', 
+        'KM_Inicial', 'KM_Final', 'Usuario', 'ID_Unico'
+    ]
+    with span("dashboard.extrato"):
+        # Só as colunas exibidas; as demais não são copiadas
+        df_ex = df_f[[c for c in cols_ordered if c in df_f.columns]].assign(
+            Data=df_f['Data'].dt.strftime('%d/%m'),
+            Sync=df_f['ID_Unico'].isin(ids_pendentes).map({True: '⏳', False: '✅'}),
+        )
+    cols_final = [c for c in cols_ordered if c in df_ex.columns]
+    if ids_pendentes or lixeira_pendente:
+        st.caption(f"⏳ {len(ids_pendentes) + len(lixeira_pendente)} alteração(ões) aguardando envio à planilha")
+
+    st.dataframe(
+        df_ex[cols_final], 
+        use_container_width=True, 
+        height=350,
+        hide_index=True,
+        column_config={
+            "Sync": st.column_config.TextColumn("", width="small", help="⏳ aguardando envio à planilha"),
+            "Data": st.column_config.TextColumn("Data", width="small"),
+            "Receita": st.column_config.NumberColumn("Faturamento Total", format="R$ %.2f", width="small"),
+            "Custos": st.column_config.NumberColumn("Custos Totais", format="R$ %.2f", width="small"),
+            "Lucro": st.column_config.NumberColumn("Lucro", format="R$ %.2f", width="small"),
+            "Urbano": st.column_config.NumberColumn("Urbano", format="%.0f", width="small"),
+            "Boraali": st.column_config.NumberColumn("BoraAli", format="%.0f", width="small"),
+            "app163": st.column_config.NumberColumn("163", format="%.0f", width="small"),
+            "Energia": st.column_config.NumberColumn("Energia", format="%.0f", width="small"),
+            "Usuario": st.column_config.TextColumn("Motorista", width="medium"),
+            "KM_Inicial": st.column_config.NumberColumn("KM Ini", format="%d", width="small"),
+            "KM_Final": st.column_config.NumberColumn("KM Fim", format="%d", width="small"),
+        }
+    )
+
+    with st.expander("🗑️ Excluir um Registro"):
+        ids = df_f['ID_Unico'].tolist()
+        if ids:
+            item_ex = st.selectbox("Selecione o ID", ids, key="delete_select")
+            if st.button("Confirmar Exclusão", key="btn_delete"):
+                # Soft-delete pela fila (só a célula Status muda, em segundo plano)
+                with span("excluir"):
+                    fila_escrita().enfileirar_lixeira(cpf, item_ex)
+                st.rerun()
+
+    st.divider()
+    # Gráficos só quando pedidos: a visão padrão do dashboard não monta figura nenhuma
+    if st.toggle("📈 Visão Gráfica", key="ver_graficos"):
+        with span("graficos"):
+            diario_f = rollup.dias(dia=f_dia, ano=ano_f, mes=mes_f)
+            versao = int(pd.util.hash_pandas_object(diario_f).sum())
+            figuras, granularidade = figuras_dashboard(cpf, (f_dia, ano_f, mes_f), versao, diario_f)
+        opcoes_grafico = {'displayModeBar': False}
+
+        st.caption("Faturamento por App")
+        if 'pizza' in figuras: st.plotly_chart(figuras['pizza'], use_container_width=True, config=opcoes_grafico)
+
+        st.caption(f"Comparativo: Faturamento x Lucro (por {granularidade})")
+        if 'evolucao' in figuras: st.plotly_chart(figuras['evolucao'], use_container_width=True, config=opcoes_grafico)
+
+        st.caption(f"Eficiência por KM (por {granularidade})")
+        if 'eficiencia' in figuras: st.plotly_chart(figuras['eficiencia'], use_container_width=True, config=opcoes_grafico)
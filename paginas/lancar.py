@@ -0,0 +1,162 @@
+"""Aba LANÇAR: o formulário do dia, a leitura dos prints e a importação de histórico.
+
+O desenho da aba só lê a última leitura do hodômetro; os lançamentos do
+motorista são carregados apenas ao importar um arquivo.
+"""
+import pandas as pd
+import streamlit as st
+
+import ocr
+from esquema import COLUNAS_OFICIAIS, gerar_id
+from importacao import importar
+from instrumentacao import span
+from paginas.comum import hoje_br, v
+from recursos import dados_do_motorista, fila_escrita, leitor_prints, leitura_odometro
+
+
+# SALVAMENTO APPEND-ONLY (Enfileira só a linha nova; o envio à planilha é em segundo plano)
+def adicionar_registro_seguro(novo_dict):
+    try:
+        with span("salvar"):
+            fila_escrita().enfileirar_anexo(novo_dict)
+        return True
+    except Exception as e:
+        st.error(f"Erro ao salvar na nuvem: {e}")
+        return False
+
+
+CAMPOS_OCR = {'Urbano': 'rec_urbano', 'Boraali': 'rec_boraali', 'app163': 'rec_app163'}
+
+
+def mostrar_ocr(prints, hashes):
+    prontos = leitor_prints().resultados(hashes)
+    linhas = [{'Print': p.name, 'App': prontos[h].get('app') or '?', 'Valor': prontos[h].get('valor')} for p, h in zip(prints, hashes)]
+    st.dataframe(pd.DataFrame(linhas), use_container_width=True, hide_index=True,
+                 column_config={"Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f")})
+    # O mesmo print enviado duas vezes conta uma vez só
+    totais = ocr.somar_por_app([prontos[h] for h in dict.fromkeys(hashes)])
+    if not totais:
+        st.caption("Não encontrei valores nos prints. Confira se o total do dia aparece na imagem.")
+    elif st.button("USAR ESSES VALORES", key="btn_ocr"):
+        st.session_state.ocr_preencher = {CAMPOS_OCR[app]: valor for app, valor in totais.items()}
+        st.rerun()
+
+
+@st.fragment(run_every=1.0)
+def acompanhar_ocr(hashes):
+    # Só este trecho redesenha a cada segundo enquanto o pool trabalha
+    prontos = leitor_prints().resultados(hashes)
+    total = len(set(hashes))
+    if len(prontos) == total: st.rerun()
+    st.progress(len(prontos) / total, text=f"Lendo prints... {len(prontos)}/{total}")
+
+
+def renderizar():
+    cpf = st.session_state.cpf_usuario
+    st.markdown(f"<h3 style='margin-bottom: 5px;'>Olá, {st.session_state.usuario} 👋</h3>", unsafe_allow_html=True)
+    hoje = hoje_br()
+    st.caption(f"Data de hoje: {hoje.strftime('%d/%m/%Y')}")
+
+    data_lanc = st.date_input("Data do Lançamento:", value=hoje, format="DD/MM/YYYY", label_visibility="collapsed", key="data_lanc_input")
+
+    # Valores lidos dos prints entram nos campos antes de eles serem desenhados
+    for campo, valor in st.session_state.pop("ocr_preencher", {}).items(): st.session_state[campo] = valor
+    if ocr.disponivel():
+        with st.expander("📸 Ler ganhos dos prints dos apps"):
+            prints = st.file_uploader("Prints", type=["png", "jpg", "jpeg"], accept_multiple_files=True,
+                                      label_visibility="collapsed", key="ocr_prints")
+            if prints:
+                with span("ocr.enviar"):
+                    hashes = leitor_prints().enviar([p.getvalue() for p in prints])
+                if len(leitor_prints().resultados(hashes)) == len(set(hashes)): mostrar_ocr(prints, hashes)
+                else: acompanhar_ocr(hashes)
+
+    st.markdown("##### 💰 Ganhos do Dia")
+    with st.container(border=True):
+        c1, c2 = st.columns(2)
+        v1 = c1.number_input("Urbano (99/Uber)", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_urbano")
+        v2 = c2.number_input("BoraAli", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_boraali")
+        v3 = c1.number_input("app163", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_app163")
+        v4 = c2.number_input("Outros", min_value=0.0, value=None, placeholder="R$ 0,00", key="rec_outros")
+
+    st.markdown("##### 💸 Custos do Dia")
+    with st.container(border=True):
+        d1, d2 = st.columns(2)
+        cust_e = d1.number_input("Combustível/Energia", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_energia")
+        cust_m = d2.number_input("Manutenção", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_manut")
+        cust_s = d1.number_input("Seguro", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_seguro")
+        cust_o = d2.number_input("Documentos/Multas", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_docs")
+        cust_a = d1.number_input("Mensalidades Apps", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_apps")
+        cust_f = d2.number_input("Outros", min_value=0.0, value=None, placeholder="R$ 0,00", key="desp_outros_f")
+
+    st.markdown("##### 🚗 Hodômetro")
+    # Só a última leitura (com a fila aplicada): os lançamentos não são carregados nesta aba
+    with span("lancar.hodometro"):
+        u_km = leitura_odometro(cpf).km
+
+    with st.container(border=True):
+        k1, k2 = st.columns(2)
+        k_ini = k1.number_input("KM Inicial", value=u_km, key="km_inicial_input")
+        k_fim = k2.number_input("KM Final", min_value=0, value=None, placeholder="Ex: 125800", key="km_final_input")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    if st.button("SALVAR REGISTRO", type="primary", key="btn_salvar"):
+        # Lógica de KM Final automático se deixado em branco ou 0
+        km_f_real = float(k_fim) if k_fim and float(k_fim) > 0 else float(k_ini)
+
+        novo_id = gerar_id()
+
+        nova = {col: 0 for col in COLUNAS_OFICIAIS}
+        nova.update({
+            'ID_Unico': novo_id, 'Status': 'Ativo', 
+            'Usuario': st.session_state.usuario, 'CPF': cpf, 
+            'Data': data_lanc.strftime("%Y-%m-%d"), 
+            'Urbano': v(v1), 'Boraali': v(v2), 'app163': v(v3), 'Outros_Receita': v(v4), 
+            'Energia': v(cust_e), 'Manuten': v(cust_m), 'Seguro': v(cust_s), 
+            'Outros_Custos': v(cust_o), 'Aplicativo': v(cust_a), 'Alimentacao': v(cust_f), 
+            'KM_Inicial': float(k_ini), 'KM_Final': km_f_real
+        })
+
+        # --- SALVAMENTO BLINDADO ---
+        if adicionar_registro_seguro(nova):
+            # Limpeza
+            campos_limpar = [
+                "rec_urbano", "rec_boraali", "rec_app163", "rec_outros",
+                "desp_energia", "desp_manut", "desp_seguro", "desp_docs", "desp_apps", "desp_outros_f",
+                "km_final_input"
+            ]
+            for campo in campos_limpar:
+                if campo in st.session_state:
+                    del st.session_state[campo]
+
+            # Aviso mostrado na recarga (sem esperar o envio à planilha)
+            st.session_state.aviso = "✅ Lançamento salvo! Enviando à planilha em segundo plano."
+            st.rerun()
+
+    # --- IMPORTAÇÃO EM LOTE (extratos antigos) ---
+    st.markdown("<br>", unsafe_allow_html=True)
+    with st.expander("📥 Importar histórico (CSV/XLSX)"):
+        st.caption("Uma linha por dia, com Data e os valores (ex.: Urbano, BoraAli, app163, Energia, KM Inicial, KM Final). "
+                   "Dias já lançados com os mesmos valores são ignorados.")
+        arquivo = st.file_uploader("Arquivo", type=["csv", "xlsx"], label_visibility="collapsed", key="import_arquivo")
+        if arquivo is not None and st.button("IMPORTAR", key="btn_importar"):
+            barra = st.progress(0.0, text="Lendo arquivo...")
+            try:
+                with span("importar"):
+                    # Os lançamentos só são carregados aqui, para achar os dias já lançados
+                    existentes = dados_do_motorista(cpf)[0].registros
+                    registros, resultado = importar(
+                        arquivo, arquivo.name, existentes, cpf=cpf, usuario=st.session_state.usuario,
+                        progresso=lambda fracao, lidas: barra.progress(fracao, text=f"{lidas} linhas lidas..."))
+                    # Pela fila, como o formulário: aparecem na hora como pendentes e o envio expira os caches
+                    if registros: fila_escrita().enfileirar_anexos(registros)
+            except Exception as e:
+                st.error(f"Erro ao importar: {e}")
+            else:
+                barra.empty()
+                resumo = (f"{resultado.novas} novos, {resultado.duplicadas} já existentes, {resultado.invalidas} inválidos"
+                          + (f", {resultado.outro_cpf} de outro CPF" if resultado.outro_cpf else ""))
+                if registros:
+                    st.session_state.aviso = f"📥 Importação concluída: {resumo}."
+                    st.rerun()
+                st.info(f"Nada novo para importar ({resumo}).")
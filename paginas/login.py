@@ -0,0 +1,33 @@
+"""Tela de login: só session_state e query params, nenhuma leitura da planilha."""
+import streamlit as st
+
+from esquema import limpar_cpf
+
+
+def renderizar(u_url, c_url):
+    """True se o motorista já entrou (pela URL); senão desenha o formulário."""
+    if u_url and len(c_url) == 11:
+        st.session_state.update({'usuario': u_url, 'cpf_usuario': c_url, 'autenticado': True})
+        return True
+    st.markdown("""
+        <div class="login-header">
+            <div class="login-logo">💎</div>
+            <h1 class="login-title">BYD Pro</h1>
+            <p class="login-subtitle">Gestão Financeira de Alta Performance</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    with st.container():
+        n_in = st.text_input("Nome do Motorista", placeholder="Como você quer ser chamado?", key="login_nome")
+        c_in = st.text_input("CPF de Acesso", placeholder="Apenas números", max_chars=11, key="login_cpf")
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        if st.button("ACESSAR SISTEMA", type="primary", key="btn_login"):
+            c_l = limpar_cpf(c_in)
+            if n_in and len(c_l) == 11:
+                st.session_state.update({'usuario': n_in, 'cpf_usuario': c_l, 'autenticado': True})
+                st.query_params.update({"user": n_in, "cpf": c_l})
+                return True
+            st.toast("⚠️ CPF inválido ou Nome vazio.", icon="🚫")
+    return False
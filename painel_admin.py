@@ -0,0 +1,54 @@
+"""Painel de desempenho (oculto): ?admin=<token> com BYD_ADMIN_TOKEN ou admin_token nos secrets."""
+import os
+
+import streamlit as st
+
+from instrumentacao import COLETOR
+
+
+def token_admin():
+    token = os.environ.get("BYD_ADMIN_TOKEN")
+    if token: return token
+    try: return st.secrets.get("admin_token")
+    except Exception: return None
+
+
+def renderizar(estatisticas_cache, estado_fila=None):
+    st.markdown("### ⏱️ Desempenho por rerun")
+    reruns = COLETOR.reruns_df()
+    if reruns.empty:
+        st.info("Nenhum rerun medido ainda neste processo.")
+        return
+
+    total = reruns["total_ms"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Reruns", len(reruns))
+    c2.metric("p50", f"{total.quantile(0.5):.0f} ms")
+    c3.metric("p90", f"{total.quantile(0.9):.0f} ms")
+    c4.metric("p99", f"{total.quantile(0.99):.0f} ms")
+
+    st.caption(f"Cache por motorista: {estatisticas_cache['acertos']} acertos, {estatisticas_cache['falhas']} cargas, "
+               f"{estatisticas_cache['sincronizacoes']} sincronizações ({estatisticas_cache['taxa_acerto']:.0%} de acerto), "
+               f"{estatisticas_cache['motoristas']} motoristas em memória")
+
+    if estado_fila is not None:
+        st.caption(f"Fila de escrita: {estado_fila['pendentes']} pendentes, {estado_fila['enviados']} enviadas"
+                   + (f", {estado_fila['concorrentes']} envio(s) concorrente(s) com outro processo" if estado_fila.get('concorrentes') else "")
+                   + (f", último erro: {estado_fila['ultimo_erro']} ({estado_fila['tentativas']} tentativas)" if estado_fila['ultimo_erro'] else ""))
+
+    st.markdown("##### Etapas (ms)")
+    st.dataframe(COLETOR.percentis(), use_container_width=True)
+
+    st.markdown("##### Por aba")
+    por_aba = reruns.groupby("rotulo")["total_ms"].describe(percentiles=[0.5, 0.9, 0.99])
+    st.dataframe(por_aba[["count", "50%", "90%", "99%", "max"]].round(1), use_container_width=True)
+
+    st.markdown("##### Reruns mais lentos")
+    st.dataframe(reruns.sort_values("total_ms", ascending=False).head(20), use_container_width=True, hide_index=True)
+
+    contadores = reruns.drop(columns=["sessao", "rerun", "rotulo", "inicio", "total_ms"]).sum()
+    if not contadores.empty:
+        st.markdown("##### Contadores acumulados")
+        st.dataframe(contadores.rename("total").to_frame(), use_container_width=True)
+
+    st.download_button("Exportar JSONL", COLETOR.jsonl(), file_name="byd_perf.jsonl", mime="application/jsonl")
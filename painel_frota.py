@@ -0,0 +1,102 @@
+"""Relatório da frota (oculto): ?frota=<token> com BYD_FROTA_TOKEN ou frota_token nos secrets."""
+import os
+
+import streamlit as st
+
+from frota import evolucao, exportar_xlsx, filtrar, por_app, ranking
+from odometro import resumo
+from paginas.comum import format_br
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+
+def token_frota():
+    token = os.environ.get("BYD_FROTA_TOKEN")
+    if token: return token
+    try: return st.secrets.get("frota_token")
+    except Exception: return None
+
+
+def renderizar(relatorio):
+    st.markdown("### 🚗 Relatório da Frota")
+    if relatorio.mensal.empty:
+        st.info("Nenhum lançamento na frota ainda.")
+        return
+
+    fc1, fc2 = st.columns(2)
+    sel_ano = fc1.selectbox("Ano", ["Todos"] + [str(a) for a in relatorio.anos()], index=1, key="frota_ano")
+    sel_mes = fc2.selectbox("Mês", ["Todos"] + MESES, key="frota_mes")
+    ano = None if sel_ano == "Todos" else int(sel_ano)
+    mes = None if sel_mes == "Todos" else MESES.index(sel_mes) + 1
+
+    # Tudo sai da tabela (CPF, mês) em cache: filtrar e reagrupar custa milissegundos
+    recorte = filtrar(relatorio.mensal, ano, mes)
+    if recorte.empty:
+        st.info("Nenhum lançamento no período.")
+        return
+    tabela = ranking(recorte, relatorio.nomes)
+    apps = por_app(recorte)
+
+    receita, lucro, km = tabela['Receita'].sum(), tabela['Lucro'].sum(), tabela['Km'].sum()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Motoristas", len(tabela))
+    c2.metric("Faturamento", format_br(receita))
+    c3.metric("Lucro", format_br(lucro))
+    c4.metric("R$/km", format_br(receita / km if km > 0 else 0.0))
+
+    st.markdown("##### Ranking por lucro")
+    st.dataframe(
+        tabela, use_container_width=True, height=420,
+        column_config={
+            "_index": st.column_config.TextColumn("CPF"),
+            "Posicao": st.column_config.NumberColumn("#", format="%d", width="small"),
+            "Receita": st.column_config.NumberColumn("Faturamento", format="R$ %.2f"),
+            "Custos": st.column_config.NumberColumn("Custos", format="R$ %.2f"),
+            "Lucro": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+            "Km": st.column_config.NumberColumn("Km", format="%d"),
+            "Fat_KM": st.column_config.NumberColumn("R$/km", format="R$ %.2f"),
+            "Lucro_KM": st.column_config.NumberColumn("Lucro/km", format="R$ %.2f"),
+            "Dias": st.column_config.NumberColumn("Dias ativos", format="%d"),
+            "Lucro_Dia": st.column_config.NumberColumn("Lucro/dia", format="R$ %.2f"),
+            "Lancamentos": st.column_config.NumberColumn("Lançamentos", format="%d"),
+            "Urbano": st.column_config.NumberColumn("Urbano", format="%.0f"),
+            "Boraali": st.column_config.NumberColumn("BoraAli", format="%.0f"),
+            "app163": st.column_config.NumberColumn("163", format="%.0f"),
+            "Outros_Receita": st.column_config.NumberColumn("Outros", format="%.0f"),
+        })
+
+    st.markdown("##### Por app")
+    st.dataframe(
+        apps, use_container_width=True, hide_index=True,
+        column_config={
+            "Valor": st.column_config.NumberColumn("Faturamento", format="R$ %.2f"),
+            "Participacao": st.column_config.ProgressColumn("Participação", format="percent", min_value=0.0, max_value=1.0),
+            "Motoristas": st.column_config.NumberColumn("Motoristas", format="%d"),
+            "Media_Motorista": st.column_config.NumberColumn("Média por motorista", format="R$ %.2f"),
+        })
+
+    mensal = evolucao(recorte)
+    st.markdown("##### Mês a mês")
+    st.dataframe(mensal.set_axis(mensal.index.strftime('%m/%Y')), use_container_width=True,
+                 column_config={"Receita": st.column_config.NumberColumn("Faturamento", format="R$ %.2f"),
+                                "Lucro": st.column_config.NumberColumn("Lucro", format="R$ %.2f"),
+                                "Km": st.column_config.NumberColumn("Km", format="%d"),
+                                "Fat_KM": st.column_config.NumberColumn("R$/km", format="R$ %.2f")})
+
+    # Conferência do hodômetro da frota inteira (feita uma vez por sincronização, no cache)
+    problemas = relatorio.odometro
+    if ano is not None: problemas = problemas[problemas['Data'].dt.year == ano]
+    if mes is not None: problemas = problemas[problemas['Data'].dt.month == mes]
+    por_motorista = resumo(problemas)
+    st.markdown("##### Hodômetro")
+    if problemas.empty: st.caption("Nenhuma inconsistência de hodômetro no período.")
+    else:
+        st.caption(f"{len(problemas)} lançamento(s) de {len(por_motorista)} motorista(s) a conferir")
+        st.dataframe(por_motorista, use_container_width=True, column_config={"_index": st.column_config.TextColumn("CPF")})
+
+    # A planilha só é montada no clique (em outra thread, sem prender o rerun)
+    periodo = "_".join(p for p in [sel_ano, sel_mes] if p != "Todos") or "todos"
+    abas = {"Ranking": tabela, "Por app": apps, "Mes a mes": mensal, "Hodometro": problemas.set_index('CPF')}
+    st.download_button("Exportar XLSX", lambda: exportar_xlsx(abas),
+                       file_name=f"byd_frota_{periodo}.xlsx", on_click="ignore",
+                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
@@ -0,0 +1,98 @@
+"""Recursos compartilhados pelo processo (``st.cache_resource``) e as leituras das páginas.
+
+Cada página pede só o que desenha: a aba LANÇAR lê a última leitura do
+hodômetro (``leitura_odometro``), o dashboard os lançamentos com os agregados
+(``dados_do_motorista``). O login não chama nada daqui.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+import ocr
+from armazenamento import obter_armazenamento
+from cache_motorista import CacheMotorista
+from esquema import frame_vazio, normalizar
+from fila_escrita import FilaEscrita, sobrepor_pendencias
+from odometro import SEM_LEITURA, mais_recente, ultima_leitura
+from rollups import DadosMotorista
+
+
+# Cache por motorista, compartilhado pelo processo (gravação só sincroniza o CPF afetado)
+def _carregar_motorista(cpf):
+    df, marca = obter_armazenamento().carregar_com_marca(cpf)
+    return DadosMotorista.de_registros(df), marca
+
+def _sincronizar_motorista(cpf, dados, marca):
+    df, marca = obter_armazenamento().sincronizar(cpf, dados.registros, marca)
+    return dados.avancar(df), marca
+
+@st.cache_resource
+def cache_motoristas():
+    return CacheMotorista(_carregar_motorista, _sincronizar_motorista, max_motoristas=256, ttl=10)
+
+# Carregamento apenas para leitura inicial (lançamentos do motorista + agregados por dia/mês)
+def carregar_dados(cpf):
+    try: return cache_motoristas().obter(cpf)
+    except: return DadosMotorista.de_registros(frame_vazio())
+
+# Só a última leitura do hodômetro, para quem ainda não tem os lançamentos em cache (aba LANÇAR)
+def _carregar_odometro(cpf):
+    return obter_armazenamento().ultimo_odometro(cpf), None
+
+@st.cache_resource
+def cache_odometro():
+    return CacheMotorista(_carregar_odometro, max_motoristas=4096, ttl=60)
+
+# Frota inteira numa única entrada (chave None = todos os CPFs), sincronizada pela mesma marca d'água
+def _carregar_frota(_):
+    from frota import RelatorioFrota
+    df, marca = obter_armazenamento().carregar_com_marca(None)
+    return RelatorioFrota.de_registros(df), marca
+
+def _sincronizar_frota(_, relatorio, marca):
+    df, marca = obter_armazenamento().sincronizar(None, relatorio.registros, marca)
+    return relatorio.avancar(df), marca
+
+@st.cache_resource
+def cache_frota():
+    return CacheMotorista(_carregar_frota, _sincronizar_frota, max_motoristas=1, ttl=60)
+
+# Fila de escrita: salvar/excluir gravam num SQLite local e uma thread envia em lotes
+@st.cache_resource
+def fila_escrita():
+    cache, odometro, frota = cache_motoristas(), cache_odometro(), cache_frota()
+    def ao_gravar(cpfs):
+        # Só os motoristas do lote sincronizam (trazem as linhas novas) na próxima leitura
+        for cpf in cpfs:
+            cache.expirar(cpf)
+            odometro.expirar(cpf)
+        frota.expirar(None)
+    return FilaEscrita(os.environ.get("BYD_FILA", "byd_fila.db"), obter_armazenamento(), ao_gravar=ao_gravar)
+
+# OCR dos prints em processos separados, com cache por hash da imagem (vale para todas as sessões)
+@st.cache_resource
+def leitor_prints():
+    return ocr.LeitorPrints()
+
+
+def dados_do_motorista(cpf):
+    """(DadosMotorista com a fila aplicada, IDs ainda na fila, IDs indo para a lixeira)."""
+    # Fila lida antes do cache: o que sair dela já está no armazenamento ao sincronizar
+    registros, lixeira = fila_escrita().pendentes(cpf)
+    dados = sobrepor_pendencias(carregar_dados(cpf), registros, lixeira)
+    return dados, {r['ID_Unico'] for r in registros}, lixeira
+
+
+def leitura_odometro(cpf):
+    """Última leitura do hodômetro com a fila aplicada, sem carregar os lançamentos se não estiverem em cache."""
+    registros, lixeira = fila_escrita().pendentes(cpf)
+    # Exclusão na fila pode ser justo a última leitura: aí vale o histórico inteiro
+    if lixeira: return sobrepor_pendencias(carregar_dados(cpf), registros, lixeira).odometro
+    dados = cache_motoristas().espiar(cpf)
+    if dados is not None: leitura = dados.odometro
+    else:
+        try: leitura = cache_odometro().obter(cpf)
+        except: leitura = SEM_LEITURA
+    if not registros: return leitura
+    return mais_recente(leitura, ultima_leitura(normalizar(pd.DataFrame(registros))))
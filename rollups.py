@@ -0,0 +1,103 @@
+"""Agregados materializados por motorista (por dia e por mês) para os KPIs do dashboard.
+
+Cada linha soma a receita por app, o custo por categoria, os km rodados e a
+quantidade de lançamentos do período. Os cards e os filtros de ano/mês leem
+daqui (no máximo algumas centenas de linhas mesmo com anos de histórico) em
+vez de somar os lançamentos a cada interação.
+
+Os agregados são imutáveis e mantidos por diferença: quando a sincronização
+traz lançamentos novos eles são somados, e quando um lançamento vai para a
+lixeira ele é subtraído.
+"""
+from typing import NamedTuple
+
+import pandas as pd
+
+from esquema import COLS_RECEITA, COLS_CUSTO, ativos, ids_em, para_somar
+from metricas import totais
+from odometro import Odometro, avancar_leitura, ultima_leitura, verificar
+
+COLS_ROLLUP = COLS_RECEITA + COLS_CUSTO + ['Km', 'Lancamentos']
+
+
+def _agregar(df, freq):
+    if df.empty: return pd.DataFrame(columns=COLS_ROLLUP, dtype='float64')
+    base = para_somar(df).assign(Lancamentos=1.0)
+    chave = df['Data'].dt.to_period(freq).dt.start_time.rename('Periodo')
+    return base.groupby(chave).sum().astype('float64')
+
+
+def _combinar(atual, delta, sinal):
+    if delta.empty: return atual
+    if atual.empty and sinal > 0: return delta
+    soma = atual.add(delta * sinal, fill_value=0)
+    return soma[soma['Lancamentos'] > 0].sort_index()
+
+
+class Rollup(NamedTuple):
+    diario: pd.DataFrame
+    mensal: pd.DataFrame
+
+    @classmethod
+    def de_registros(cls, df):
+        df = ativos(df)
+        return cls(_agregar(df, 'D'), _agregar(df, 'M'))
+
+    def somar(self, df):
+        return Rollup(_combinar(self.diario, _agregar(df, 'D'), 1), _combinar(self.mensal, _agregar(df, 'M'), 1))
+
+    def subtrair(self, df):
+        return Rollup(_combinar(self.diario, _agregar(df, 'D'), -1), _combinar(self.mensal, _agregar(df, 'M'), -1))
+
+    def periodo(self, dia=None, ano=None, mes=None):
+        """Linhas do agregado no filtro do dashboard: um dia, ou ano e/ou mês (None = todos)."""
+        if dia is not None:
+            return self.diario[self.diario.index == pd.Timestamp(dia)]
+        idx = self.mensal.index
+        filtro = pd.Series(True, index=idx)
+        if ano is not None: filtro &= idx.year == ano
+        if mes is not None: filtro &= idx.month == mes
+        return self.mensal[filtro.to_numpy()]
+
+    def dias(self, dia=None, ano=None, mes=None):
+        """Linhas do agregado diário no mesmo filtro de ``periodo`` (base dos gráficos)."""
+        idx = self.diario.index
+        if dia is not None: return self.diario[idx == pd.Timestamp(dia)]
+        filtro = pd.Series(True, index=idx)
+        if ano is not None: filtro &= idx.year == ano
+        if mes is not None: filtro &= idx.month == mes
+        return self.diario[filtro.to_numpy()]
+
+    def anos(self):
+        return sorted(self.mensal.index.year.unique().tolist(), reverse=True)
+
+    def ultimo_dia(self, ate):
+        """Último dia com lançamento até ``ate`` (ignora datas futuras)."""
+        dias = self.diario.index[self.diario.index <= pd.Timestamp(ate)]
+        return dias.max() if len(dias) else None
+
+
+def totais_agregado(agregado):
+    """Receita, custos, lucro e km de um recorte do rollup."""
+    return totais(agregado)
+
+
+class DadosMotorista(NamedTuple):
+    """O que o cache guarda por CPF: lançamentos, agregados, última leitura e conferência do hodômetro, consistentes entre si."""
+    registros: pd.DataFrame
+    rollup: Rollup
+    odometro: Odometro
+    conferencia_km: pd.DataFrame
+
+    @classmethod
+    def de_registros(cls, df):
+        return cls(df, Rollup.de_registros(df), ultima_leitura(df), verificar(df))
+
+    def avancar(self, df):
+        """Novo estado após uma sincronização, ajustando os agregados e o hodômetro só pela diferença."""
+        antes, depois = ativos(self.registros), ativos(df)
+        entrou = depois[~ids_em(depois['ID_Unico'], antes['ID_Unico'])]
+        saiu = antes[~ids_em(antes['ID_Unico'], depois['ID_Unico'])]
+        # Lançamentos não mudam depois de gravados: sem entrada nem saída, a conferência continua valendo
+        conferencia = self.conferencia_km if entrou.empty and saiu.empty else verificar(df)
+        return DadosMotorista(df, self.rollup.somar(entrou).subtrair(saiu), avancar_leitura(self.odometro, entrou, saiu, depois), conferencia)